@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     # 模型提供商配置
     EMBEDDING_PROVIDER: Literal["openai", "dashscope"] = os.getenv("EMBEDDING_PROVIDER", "openai")
     LLM_PROVIDER: Literal["openai", "dashscope"] = os.getenv("LLM_PROVIDER", "openai")
+    EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # 单次嵌入请求包含的文本块数
     
     # OpenAI配置
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -54,6 +55,10 @@ class Settings(BaseSettings):
     MILVUS_METADATA_FIELD: str = os.getenv("MILVUS_METADATA_FIELD", "metadata")
     MILVUS_ID_FIELD: str = os.getenv("MILVUS_ID_FIELD", "id")
 
+    # 向量写入配置
+    VECTOR_INSERT_BATCH_SIZE: int = int(os.getenv("VECTOR_INSERT_BATCH_SIZE", "256"))  # 单次写入向量存储的节点数
+    VECTOR_INSERT_CONCURRENCY: int = int(os.getenv("VECTOR_INSERT_CONCURRENCY", "4"))  # 同时进行的向量写入批次数
+
     # Elasticsearch配置
     ELASTICSEARCH_URL: str = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
     ELASTICSEARCH_USERNAME: str = os.getenv("ELASTICSEARCH_USERNAME", "")
@@ -74,6 +79,10 @@ class Settings(BaseSettings):
     # 文档处理配置
     UPLOAD_DIR: str = "data/uploads"
     PROCESSED_DIR: str = "data/processed"
+    CACHE_DIR: str = "data/cache"  # 文档转换结果缓存目录
+    PIPELINE_CACHE_ENABLED: bool = os.getenv("PIPELINE_CACHE_ENABLED", "false").lower() == "true"  # 是否复用相同文档的处理管道结果
+    MMAP_THRESHOLD_BYTES: int = int(os.getenv("MMAP_THRESHOLD_BYTES", str(16 * 1024 * 1024)))  # 超过该大小的文本文件通过内存映射读取
+    NATIVE_TEXT_SPLITTER_ENABLED: bool = os.getenv("NATIVE_TEXT_SPLITTER_ENABLED", "false").lower() == "true"  # 安装semantic-text-splitter时用其切分无结构的普通文本
     SUPPORTED_DOCUMENT_TYPES: List[str] = [
         ".pdf", ".docx", ".doc", ".txt", ".md",
         ".ppt", ".pptx", ".csv", ".xlsx", ".xls"
@@ -81,6 +90,9 @@ class Settings(BaseSettings):
 
     # 数据库配置
     DATABASE_URL: str = MYSQL_URL  # 强制使用 MySQL 连接字符串，忽略环境变量
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))  # 连接池常驻连接数
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # 突发并发时允许超出连接池的连接数
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # 连接回收时间（秒），避免使用被服务端关闭的连接
 
     # 安全配置
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key")
@@ -276,4 +288,5 @@ settings = get_settings()
 # 确保存储目录存在
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 os.makedirs(settings.PROCESSED_DIR, exist_ok=True)
+os.makedirs(settings.CACHE_DIR, exist_ok=True)
 os.makedirs(os.path.join(settings.PROCESSED_DIR, "markdown"), exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""MarkItDown转换结果的磁盘缓存，按文件内容哈希复用已生成的Markdown"""
+import hashlib
+import logging
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import markitdown
+
+from enterprise_kb.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 缓存条目上限，超出后按写入顺序淘汰最早的条目
+MAX_ENTRIES = 4096
+
+# 旧版本直接写在缓存根目录下的条目（完整SHA-256文件名）及其临时文件
+_LEGACY_ENTRY_RE = re.compile(r'[0-9a-f]{64}(?:\.\d+)?\.(?:md|tmp)')
+
+_lock = threading.Lock()
+_entries: Optional["OrderedDict[str, None]"] = None
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def _cache_dir() -> Path:
+    """缓存目录"""
+    return Path(settings.CACHE_DIR) / "md"
+
+
+def _file_digest(path: str) -> str:
+    """通过内存映射计算文件内容的SHA-256，不将整个文件读入内存"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+def _cache_key(path: str, variant: str) -> str:
+    """缓存键：文件内容哈希，并区分文件扩展名、markitdown版本和转换选项"""
+    extension = os.path.splitext(path)[1].lower()
+    key = hashlib.sha256()
+    key.update(_file_digest(path).encode())
+    key.update(f"|{extension}|{getattr(markitdown, '__version__', '')}|{variant}".encode())
+    return key.hexdigest()[:32]
+
+
+def _remove_legacy_entries(cache_dir: Path) -> None:
+    """删除旧版本写在缓存根目录下的条目，这些条目的键不再使用，不会被命中或淘汰"""
+    try:
+        legacy = [p for p in cache_dir.parent.iterdir() if _LEGACY_ENTRY_RE.fullmatch(p.name)]
+    except OSError:
+        return
+    for path in legacy:
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"删除旧MarkItDown缓存条目失败: {path}, {str(e)}")
+    if legacy:
+        logger.info(f"已删除旧MarkItDown缓存条目 {len(legacy)} 个")
+
+
+def _load_entries(cache_dir: Path) -> "OrderedDict[str, None]":
+    """首次使用时按修改时间加载已有缓存条目，恢复先进先出顺序，并清理旧版本的条目"""
+    global _entries
+    if _entries is None:
+        _remove_legacy_entries(cache_dir)
+        try:
+            files = sorted(cache_dir.glob("*.md"), key=lambda p: p.stat().st_mtime)
+        except OSError:
+            files = []
+        _entries = OrderedDict((p.stem, None) for p in files)
+    return _entries
+
+
+def _record_entry(cache_dir: Path, key: str) -> None:
+    """登记新写入的条目，超出上限时删除最早的条目"""
+    with _lock:
+        entries = _load_entries(cache_dir)
+        entries[key] = None
+        entries.move_to_end(key)
+        while len(entries) > MAX_ENTRIES:
+            oldest, _ = entries.popitem(last=False)
+            _stats['evictions'] += 1
+            try:
+                (cache_dir / f"{oldest}.md").unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"删除MarkItDown缓存条目失败: {oldest}, {str(e)}")
+
+
+def cached_convert(converter: Any, path: str, variant: str = "") -> str:
+    """
+    使用MarkItDown转换文件，相同内容的文件直接返回缓存的Markdown
+
+    Args:
+        converter: MarkItDown转换器实例
+        path: 文件路径
+        variant: 影响转换结果的选项标识（如是否启用插件），作为缓存键的一部分
+
+    Returns:
+        Markdown内容
+    """
+    cache_dir = _cache_dir()
+    key = _cache_key(path, variant)
+    cache_path = cache_dir / f"{key}.md"
+
+    try:
+        markdown_content = cache_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        pass
+    else:
+        with _lock:
+            _stats['hits'] += 1
+        logger.info(f"命中MarkItDown转换缓存: {path}")
+        return markdown_content
+
+    with _lock:
+        _stats['misses'] += 1
+
+    result = converter.convert(path)
+    markdown_content = getattr(result, 'text_content', result)
+
+    # 先写临时文件再替换，避免并发读取到不完整的缓存
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(markdown_content, encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+        _record_entry(cache_dir, key)
+    except OSError as e:
+        logger.warning(f"写入MarkItDown转换缓存失败: {str(e)}")
+
+    return markdown_content
+
+
+def md_cache_stats() -> Dict[str, int]:
+    """
+    获取缓存统计信息
+
+    Returns:
+        命中、未命中、淘汰次数及当前条目数
+    """
+    with _lock:
+        entries = _load_entries(_cache_dir())
+        return {**_stats, 'entries': len(entries)}
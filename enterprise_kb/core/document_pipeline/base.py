@@ -1,4 +1,5 @@
 """文档处理管道基础模块，定义文档处理器基类和处理管道"""
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Type, Optional
 
@@ -21,6 +22,18 @@ class DocumentProcessor(ABC):
         """
         pass
     
+    async def process_async(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        异步处理文档，在线程池中执行同步的process，处理逻辑只在process中维护
+        
+        Args:
+            context: 处理上下文
+            
+        Returns:
+            更新后的处理上下文
+        """
+        return await asyncio.to_thread(self.process, context)
+    
     @classmethod
     def supports_file_type(cls, file_type: str) -> bool:
         """
@@ -65,12 +78,35 @@ class DocumentPipeline:
         """
         for processor in self.processors:
             context = processor.process(context)
+            # 已从缓存获得完整结果，跳过剩余处理器
+            if context.get('_short_circuit'):
+                break
+        return context
+    
+    async def process_async(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        按顺序异步执行管道中的处理器，多个文档可在同一事件循环中并发处理
+        
+        Args:
+            context: 初始处理上下文
+            
+        Returns:
+            最终处理结果
+        """
+        for processor in self.processors:
+            context = await processor.process_async(context)
+            if context.get('_short_circuit'):
+                break
         return context
         
 class PipelineFactory:
     """处理管道工厂，根据文件类型创建合适的处理管道"""
     
     _processors: Dict[str, Type[DocumentProcessor]] = {}
+    # 文件类型到处理器类的索引，按注册顺序排列，创建管道时无需逐个判断处理器
+    _by_type: Dict[str, List[Type[DocumentProcessor]]] = {}
+    # 索引对应的注册表，注册表被整体替换（如测试中重置）时需要重建索引
+    _indexed_processors: Optional[Dict[str, Type[DocumentProcessor]]] = None
     
     @classmethod
     def register_processor(cls, processor_class: Type[DocumentProcessor]):
@@ -83,12 +119,53 @@ class PipelineFactory:
         Returns:
             处理器类，支持作为装饰器使用
         """
-        cls._processors[processor_class.__name__] = processor_class
+        name = processor_class.__name__
+        previous = cls._processors.get(name)
+        cls._processors[name] = processor_class
+        
+        if cls._indexed_processors is not cls._processors:
+            cls._rebuild_type_index()
+        elif previous is not None:
+            # 同名处理器重新注册时保持原有位置，与注册表的顺序一致
+            for processors in cls._by_type.values():
+                for i, registered in enumerate(processors):
+                    if registered is previous:
+                        processors[i] = processor_class
+            if previous.SUPPORTED_TYPES != processor_class.SUPPORTED_TYPES:
+                cls._rebuild_type_index()
+        else:
+            for file_type in processor_class.SUPPORTED_TYPES:
+                cls._by_type.setdefault(file_type.lower(), []).append(processor_class)
         return processor_class
     
+    @classmethod
+    def _rebuild_type_index(cls) -> None:
+        """根据当前注册表重建文件类型索引"""
+        by_type: Dict[str, List[Type[DocumentProcessor]]] = {}
+        for processor_class in cls._processors.values():
+            for file_type in processor_class.SUPPORTED_TYPES:
+                by_type.setdefault(file_type.lower(), []).append(processor_class)
+        cls._by_type = by_type
+        cls._indexed_processors = cls._processors
+    
+    @classmethod
+    def get_processors_for_type(cls, file_type: str) -> List[Type[DocumentProcessor]]:
+        """
+        获取支持指定文件类型的处理器类
+        
+        Args:
+            file_type: 文件类型
+            
+        Returns:
+            按注册顺序排列的处理器类列表
+        """
+        if cls._indexed_processors is not cls._processors:
+            cls._rebuild_type_index()
+        return list(cls._by_type.get(file_type.lower(), []))
+    
     @classmethod
     def create_pipeline(cls, file_type: str, custom_processors: Optional[List[str]] = None, 
-                       use_markitdown: bool = True) -> DocumentPipeline:
+                       use_markitdown: bool = True, use_cache: bool = False) -> DocumentPipeline:
         """
         创建处理管道
         
@@ -96,6 +173,7 @@ class PipelineFactory:
             file_type: 文件类型
             custom_processors: 自定义处理器列表，如果提供则按顺序使用这些处理器
             use_markitdown: 是否使用MarkItDown处理器（默认为True）
+            use_cache: 是否复用相同输入的管道处理结果（默认为False）
             
         Returns:
             配置好的处理管道
@@ -106,6 +184,9 @@ class PipelineFactory:
         if "FileValidator" in cls._processors:
             pipeline.add_processor(cls._processors["FileValidator"]())
         
+        # 管道结果缓存紧跟在文件验证之后，命中时跳过后续所有处理器
+        cache_loader_index = len(pipeline.processors)
+        
         # 如果指定使用MarkItDown，优先添加MarkItDown处理器
         if use_markitdown and "MarkItDownProcessor" in cls._processors:
             pipeline.add_processor(cls._processors["MarkItDownProcessor"]())
@@ -119,12 +200,34 @@ class PipelineFactory:
                     
                 if processor_name in cls._processors:
                     pipeline.add_processor(cls._processors[processor_name]())
-            return pipeline
+            return cls._add_cache_processors(pipeline, cache_loader_index) if use_cache else pipeline
         
         # 否则，添加支持该文件类型的所有处理器，排除已添加的处理器
         added_processor_names = [p.__class__.__name__ for p in pipeline.processors]
-        for processor_name, processor_class in cls._processors.items():
-            if processor_name not in added_processor_names and processor_class.supports_file_type(file_type):
+        for processor_class in cls.get_processors_for_type(file_type):
+            if processor_class.__name__ not in added_processor_names:
                 pipeline.add_processor(processor_class())
                 
+        return cls._add_cache_processors(pipeline, cache_loader_index) if use_cache else pipeline
+    
+    @classmethod
+    def _add_cache_processors(cls, pipeline: DocumentPipeline, loader_index: int) -> DocumentPipeline:
+        """
+        为管道添加结果缓存的读取和写入处理器
+        
+        Args:
+            pipeline: 处理管道
+            loader_index: 缓存读取处理器插入的位置
+            
+        Returns:
+            处理管道
+        """
+        loader_class = cls._processors.get("PipelineCacheLoader")
+        store_class = cls._processors.get("PipelineCacheStore")
+        if loader_class is None or store_class is None:
+            return pipeline
+            
+        processor_names = [p.__class__.__name__ for p in pipeline.processors]
+        pipeline.processors.insert(loader_index, loader_class(processor_names))
+        pipeline.add_processor(store_class())
         return pipeline 
\ No newline at end of file
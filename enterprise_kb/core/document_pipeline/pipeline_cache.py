@@ -0,0 +1,208 @@
+"""处理管道结果缓存，相同输入的文档再次处理时直接复用上次的处理结果"""
+import base64
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from enterprise_kb.core.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 影响处理结果的配置项，纳入缓存键
+_KEY_SETTINGS = (
+    "MAX_CHUNK_SIZE",
+    "NATIVE_TEXT_SPLITTER_ENABLED",
+    "EMBEDDING_PROVIDER",
+    "OPENAI_EMBED_MODEL_NAME",
+    "DASHSCOPE_EMBED_MODEL_NAME",
+)
+
+# 缓存条目上限和有效期，超出后淘汰最早的条目
+MAX_ENTRIES = 10_000
+MAX_AGE_SECONDS = 7 * 24 * 3600
+
+
+@functools.lru_cache(maxsize=1)
+def pipeline_version() -> str:
+    """
+    管道代码版本，由处理管道包内各模块的源码计算，处理器代码变化后旧缓存自动失效
+
+    Returns:
+        版本摘要
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _to_json(value: Any) -> Any:
+    """将处理结果转换为可JSON序列化的结构，元组、数组等类型加标记以便还原"""
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, tuple):
+        return {"__tuple__": [_to_json(v) for v in value]}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _to_json(v) for k, v in value.items()}
+        return {"__items__": [[_to_json(k), _to_json(v)] for k, v in value.items()]}
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        return {
+            "__ndarray__": base64.b64encode(array.tobytes()).decode("ascii"),
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"无法缓存的结果类型: {type(value).__name__}")
+
+
+def _from_json(value: Dict[str, Any]) -> Any:
+    """json.loads的object_hook，还原_to_json标记的类型"""
+    if "__tuple__" in value:
+        return tuple(value["__tuple__"])
+    if "__items__" in value:
+        return dict(value["__items__"])
+    if "__ndarray__" in value:
+        data = base64.b64decode(value["__ndarray__"])
+        return np.frombuffer(data, dtype=np.dtype(value["dtype"])).reshape(value["shape"]).copy()
+    if "__datetime__" in value:
+        return datetime.datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+class PipelineCache:
+    """基于SQLite的处理管道结果存储，结果以JSON保存"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = MAX_ENTRIES,
+        max_age_seconds: float = MAX_AGE_SECONDS
+    ):
+        """
+        初始化管道结果缓存
+
+        Args:
+            db_path: SQLite数据库路径，默认位于缓存目录下
+            max_entries: 最多保留的条目数
+            max_age_seconds: 条目有效期（秒）
+        """
+        self.db_path = db_path or os.path.join(settings.CACHE_DIR, "pipeline_cache.sqlite3")
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            # 旧版本以pickle保存结果的表不再读取
+            conn.execute("DROP TABLE IF EXISTS pipeline_cache")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS pipeline_results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS pipeline_results_created_at ON pipeline_results (created_at)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """每次操作使用独立连接并在结束时提交和关闭，可在多线程中安全使用"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def compute_key(file_path: str, file_type: str, options: Dict[str, Any], processors: List[str]) -> str:
+        """
+        计算缓存键，由文件内容、文件类型、处理选项、处理器组成、相关配置和管道代码版本共同决定
+
+        Args:
+            file_path: 文件路径
+            file_type: 文件类型
+            options: 影响处理结果的输入，如处理选项和文档元数据
+            processors: 管道中的处理器名称
+
+        Returns:
+            缓存键
+        """
+        with open(file_path, 'rb') as f:
+            digest = hashlib.file_digest(f, 'sha256')
+        key_settings = {name: getattr(settings, name, None) for name in _KEY_SETTINGS}
+        digest.update(file_type.encode())
+        digest.update(json.dumps(options, sort_keys=True, default=str).encode())
+        digest.update(json.dumps(key_settings, sort_keys=True, default=str).encode())
+        digest.update(",".join(processors).encode())
+        digest.update(pipeline_version().encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的处理结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            处理结果，未命中、已过期或读取失败时返回None
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT value FROM pipeline_results WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.max_age_seconds)
+                ).fetchone()
+            return json.loads(row[0], object_hook=_from_json) if row else None
+        except Exception as e:
+            logger.warning(f"读取管道结果缓存失败: {str(e)}")
+            return None
+
+    def set(self, key: str, outputs: Dict[str, Any]) -> None:
+        """
+        保存处理结果，并淘汰过期和超出数量上限的条目
+
+        Args:
+            key: 缓存键
+            outputs: 处理结果
+        """
+        try:
+            value = json.dumps(_to_json(outputs), ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"处理结果无法缓存: {str(e)}")
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO pipeline_results (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, now)
+                )
+                conn.execute(
+                    "DELETE FROM pipeline_results WHERE created_at < ?",
+                    (now - self.max_age_seconds,)
+                )
+                conn.execute(
+                    "DELETE FROM pipeline_results WHERE key IN ("
+                    "SELECT key FROM pipeline_results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        except Exception as e:
+            logger.warning(f"写入管道结果缓存失败: {str(e)}")
@@ -1,18 +1,684 @@
 """文档处理器实现模块"""
 import os
-from typing import Dict, Any, List
+import re
+import mmap
+import asyncio
+import difflib
+import functools
+import hashlib
+import heapq
+import multiprocessing
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 import logging
 import fitz  # PyMuPDF
 import docx
 import markitdown
 from pathlib import Path
 import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
 
 from enterprise_kb.core.document_pipeline.base import DocumentProcessor, PipelineFactory
+from enterprise_kb.core.document_pipeline._md_cache import cached_convert
+from enterprise_kb.core.document_pipeline.pipeline_cache import PipelineCache
 from enterprise_kb.core.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# 优先使用第三方regex引擎扫描大型Markdown文本，未安装时回退到标准库re
+try:
+    import regex as _re_fast
+except ImportError:
+    _re_fast = re
+
+# 可选使用numba将段落打包循环编译为机器码，未安装时使用同一逻辑的纯Python实现
+try:
+    from numba import njit as _njit
+except ImportError:
+    _njit = None
+
+# 可选使用Aho-Corasick自动机在分块中批量查找引用目标，未安装时逐个子串查找
+try:
+    import ahocorasick as _ahocorasick
+except ImportError:
+    _ahocorasick = None
+
+# 可选使用SimSIMD批量计算嵌入向量的点积，未安装时使用NumPy矩阵运算
+try:
+    import simsimd as _simsimd
+except ImportError:
+    _simsimd = None
+
+# 可选使用FAISS的精确内积索引为大量文本块计算查询相关性
+try:
+    import faiss as _faiss
+except ImportError:
+    _faiss = None
+
+# 可选使用Rust实现的semantic-text-splitter切分普通文本，需通过配置显式启用
+try:
+    from semantic_text_splitter import TextSplitter as _NativeTextSplitter
+except ImportError:
+    _NativeTextSplitter = None
+
+# HTML解析依次优先使用selectolax、lxml和BeautifulSoup，均为可选依赖
+# selectolax 1.0起只提供lexbor后端，旧版本回退到modest后端
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxHTMLParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _SelectolaxHTMLParser
+    except ImportError:
+        _SelectolaxHTMLParser = None
+
+try:
+    from lxml import etree as _lxml_etree, html as _lxml_html
+except ImportError:
+    _lxml_etree = _lxml_html = None
+
+try:
+    from bs4 import BeautifulSoup as _BeautifulSoup, FeatureNotFound as _FeatureNotFound
+except ImportError:
+    _BeautifulSoup = _FeatureNotFound = None
+
+# 内容不属于正文的HTML元素，提取文本前移除
+_HTML_NON_TEXT_TAGS = ('script', 'style', 'template')
+
+# 文档结构提取使用的正则表达式，模块加载时编译一次
+_HEADING_RE = _re_fast.compile(r'^(#{1,6})\s+(.*?)$', _re_fast.MULTILINE)
+_IMAGE_RE = _re_fast.compile(r'!\[(.*?)\]\((.*?)\)')
+
+# HTML纯文本提取的备用正则表达式
+_TAG_RE = re.compile(r'<[^>]*>')
+_WS_RE = re.compile(r'\s+')
+
+# Markdown转纯文本：去除标题标记、成对的强调和行内代码符号，图片和链接只保留文字
+# 强调符号须成对出现且紧贴内容，下划线不用于词内强调，不处理"2 * 3"、snake__case这类普通文本
+_MD_HEADING_MARK_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_MD_LINK_RE = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+_MD_CODE_SPAN_RE = re.compile(r'`([^`\n]+)`')
+_MD_STRONG_RE = re.compile(
+    r'(?<!\*)\*\*(?=\S)([^\n]+?)(?<=\S)\*\*(?!\*)|(?<!\w)__(?=\S)([^\n]+?)(?<=\S)__(?!\w)'
+)
+_MD_EM_RE = re.compile(r'(?<!\*)\*(?=[^\s*])([^*\n]+?)(?<=\S)\*(?!\*)')
+
+# Markdown引用关系识别，匹配不跨行，可在整篇文本上一次扫描；与标题一样优先使用regex引擎
+# 1. Markdown链接格式 [text](url)
+_LINK_RE = _re_fast.compile(r'\[([^\]\n]+)\]\(([^)\n]+)\)')
+# 2. 引用格式 [ref: xxx] 或 [[xxx]]
+_REF_RE = _re_fast.compile(r'\[ref:([^\]\n]+)\]|\[\[([^\]\n]+)\]\]')
+# 3. 中文引用格式 如「参见：xxx」
+_CN_REF_RE = _re_fast.compile(r'[「『]参见[:：]([^」』\n]+)[」』]')
+
+# Markdown结构解析中的列表项和标题ID生成
+_LIST_ITEM_RE = re.compile(r'^\s*(?:[*+-]|\d+\.)\s')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_HEADING_ID_CLEAN_RE = re.compile(r'[^a-z0-9\u4e00-\u9fa5]+')
+
+# 结构感知分割识别的代码块、列表和表格
+_CODE_BLOCK_RE = re.compile(r'```[\w]*\n.*?```', re.DOTALL)
+_LIST_BLOCK_RE = re.compile(r'(?:(?:\n|^)\s*(?:[*+-]|\d+\.)\s+.*)+', re.DOTALL)
+_TABLE_BLOCK_RE = re.compile(r'(?:\|.*\|(?:\n|$))+', re.DOTALL)
+
+# 代码块和列表的拆分
+_CODE_FENCE_RE = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
+_CODE_UNIT_RE = re.compile(r'((?:def|function|func|fn|public|private|protected|class|module|interface)\s+\w+[\s\S]*?)(?=\n\s*(?:def|function|func|fn|public|private|protected|class|module|interface)\s+|\Z)', re.DOTALL)
+# 可按函数/类定义切分的代码语言
+_CODE_UNIT_LANGUAGES = frozenset(["python", "js", "javascript", "java", "c", "cpp", "csharp", "go", "rust"])
+_LIST_ITEM_BLOCK_RE = re.compile(r'(?:^|\n)(\s*(?:[*+-]|\d+\.)\s+.*(?:\n\s+.*)*)', re.MULTILINE)
+
+# 段落和句子切分（支持中英文标点）
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+_SENTENCE_END_RE = re.compile(r'([.!?。！？；;]\s*)')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?。！？])\s+')
+
+# 元数据提取
+_TIME_REF_RE = re.compile(r'\d{4}年|\d{4}-\d{2}|\d{4}/\d{2}|\d{4}\.\d{2}')
+_WORD_RE = re.compile(r'[\w\u4e00-\u9fff]+')
+_EN_ENTITY_RE = re.compile(r'\b[A-Z][a-zA-Z]*(?:\s+[A-Z][a-zA-Z]*)*\b')
+_CN_NAME_RE = re.compile(r'[\u4e00-\u9fff]{2,3}(?:先生|女士|老师|教授|博士)')
+_CN_TITLE_SUFFIX_RE = re.compile(r'(先生|女士|老师|教授|博士)$')
+_URL_RE = re.compile(r'https?://\S+')
+_CITATION_RE = re.compile(r'\[(\d+)\]')
+# 词频关键词提取时过滤的停用词（简化版）
+_KEYWORD_STOPWORDS = frozenset({
+    '的', '了', '和', '是', '在', '有', '与', '这', '那', '之', '或', '及',
+    'a', 'an', 'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'with',
+})
+# 主题领域识别词表：关键词（小写）到主题领域
+_TOPIC_TERMS = {
+    # 技术主题
+    '技术': ('python', 'java', 'javascript', 'html', 'css', 'coding', 'algorithm', 'programming',
+           '编程', '算法', '代码', '开发', '软件', '数据库', '测试', '部署', '服务器'),
+    # 商业主题
+    '商业': ('market', 'business', 'company', 'strategy', 'investment', 'customer', 'product',
+           '市场', '商业', '公司', '策略', '投资', '客户', '产品', '营销', '销售'),
+    # 教育主题
+    '教育': ('education', 'teaching', 'learning', 'student', 'school', 'university', 'course',
+           '教育', '教学', '学习', '学生', '学校', '大学', '课程', '培训'),
+    # 医疗主题
+    '医疗': ('medical', 'healthcare', 'disease', 'patient', 'treatment', 'medicine', 'doctor',
+           '医疗', '健康', '疾病', '患者', '治疗', '药物', '医生', '医院'),
+    # 扩展更多领域...
+}
+_TOPIC_BY_TERM = {term: topic for topic, terms in _TOPIC_TERMS.items() for term in terms}
+# 中文人名识别依赖的称谓后缀，文本中不含任何后缀时跳过人名正则扫描
+_CN_TITLE_SUFFIXES = ('先生', '女士', '老师', '教授', '博士')
+
+# 按标题分块时默认识别的一至三级标题前缀
+_DEFAULT_HEADING_MARKERS = ('# ', '## ', '### ')
+_HEADING_PREFIX_RE = re.compile(r'^(?:#{1,3}) ')
+
+# 大段落分句：句末标点后的空白或原有换行处切分
+_SENT_RE = re.compile(r'(?<=[.!?])\s+|\n')
+
+# 分块中表示引用的标记
+_REF_MARKERS = ('[ref:', '[[', '「参见')
+# 重要引用目标达到该数量时才构建Aho-Corasick自动机
+_AHOCORASICK_MIN_TARGETS = 8
+# 文本块超过该数量时使用FAISS内积索引计算相关性
+_FAISS_MIN_CHUNKS = 256
+
+# Markdown结构解析结果缓存，按文本内容摘要复用，超出条目数或总文本量时淘汰最久未使用的条目
+# 解析结果包含各段落正文，占用内存与原文相当，按原文字符数计算缓存总量
+_STRUCTURE_CACHE_SIZE = 256
+_STRUCTURE_CACHE_MAX_CHARS = 16 * 1024 * 1024
+# 超过该字符数的文档不缓存，避免单个大文档挤占全部容量
+_STRUCTURE_CACHE_MAX_DOC_CHARS = _STRUCTURE_CACHE_MAX_CHARS // 4
+_structure_cache: "OrderedDict[bytes, Tuple[Dict[str, Any], int]]" = OrderedDict()
+_structure_cache_chars = 0
+_structure_cache_lock = threading.Lock()
+
+# PDF页数超过该值时才启用多进程提取，避免小文档承担进程池启动开销
+_PDF_PARALLEL_MIN_PAGES = 32
+# 每个工作进程至少分配的页数
+_PDF_PAGES_PER_WORKER = 16
+# 工作进程数上限，超过后进程启动和结果传输开销抵消并行收益
+_PDF_MAX_WORKERS = 8
+
+# 所有PDF处理器共享的提取进程池，首次使用时创建
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _iter_lines(text: str):
+    """
+    逐行迭代文本，结果与text.split('\n')相同，但不一次性生成全部行的列表
+    
+    Args:
+        text: 文本内容
+        
+    Yields:
+        不含换行符的行
+    """
+    start = 0
+    find = text.find
+    while True:
+        end = find('\n', start)
+        if end < 0:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
+
+
+def _pack_paragraphs(lengths, max_size, starts, ends, oversized):
+    """
+    按长度将连续段落打包为块，只计算切分位置，不处理字符串
+    
+    规则与逐段拼接的实现一致：超长段落单独成块（由调用方再切分），
+    块以空段落开头时由下一个段落替换。
+    
+    Args:
+        lengths: 各段落长度
+        max_size: 最大块大小
+        starts: 输出，各块起始段落下标
+        ends: 输出，各块结束段落下标（不包含）
+        oversized: 输出，该块是否为需要再切分的超长段落
+        
+    Returns:
+        块数量
+    """
+    count = 0
+    group_start = 0
+    group_len = 0  # 当前块包含的段落数
+    current_size = 0
+    
+    for i in range(len(lengths)):
+        size = lengths[i]
+        has_content = group_len > 0 and lengths[group_start] > 0
+        
+        if size > max_size:
+            if has_content:
+                starts[count] = group_start
+                ends[count] = group_start + group_len
+                oversized[count] = False
+                count += 1
+            starts[count] = i
+            ends[count] = i + 1
+            oversized[count] = True
+            count += 1
+            group_len = 0
+            current_size = 0
+            continue
+            
+        if current_size + size > max_size:
+            starts[count] = group_start
+            ends[count] = group_start + group_len
+            oversized[count] = False
+            count += 1
+            group_start = i
+            group_len = 1
+            current_size = size
+        else:
+            if has_content:
+                group_len += 1
+            else:
+                group_start = i
+                group_len = 1
+            current_size += size
+            
+    if group_len > 0 and lengths[group_start] > 0:
+        starts[count] = group_start
+        ends[count] = group_start + group_len
+        oversized[count] = False
+        count += 1
+        
+    return count
+
+
+_pack_paragraphs_jit = _njit(cache=True)(_pack_paragraphs) if _njit is not None else None
+
+
+def _pack_sentences(lengths, max_size, starts, ends, oversized):
+    """
+    按长度将句子打包为带重叠的块，只计算每块包含的句子范围
+    
+    规则与逐句拼接的实现一致：句子间以一个空格连接；超长句子单独成块（由调用方再切分）；
+    块超出大小时，新块从前一句往前再多取两句作为重叠。
+    
+    Args:
+        lengths: 各句子长度
+        max_size: 最大块大小
+        starts: 输出，各块起始句子下标
+        ends: 输出，各块结束句子下标（不包含）
+        oversized: 输出，该块是否为需要再切分的超长句子
+        
+    Returns:
+        块数量
+    """
+    count = 0
+    group_start = 0
+    group_end = 0
+    current_size = 0  # 当前块以空格拼接后的长度
+    
+    for i in range(len(lengths)):
+        size = lengths[i]
+        
+        if size > max_size:
+            if current_size > 0:
+                starts[count] = group_start
+                ends[count] = group_end
+                oversized[count] = False
+                count += 1
+            starts[count] = i
+            ends[count] = i + 1
+            oversized[count] = True
+            count += 1
+            group_start = i + 1
+            group_end = i + 1
+            current_size = 0
+            continue
+            
+        if current_size > 0 and current_size + size + 1 > max_size:
+            starts[count] = group_start
+            ends[count] = group_end
+            oversized[count] = False
+            count += 1
+            # 前一句及其之前两句作为重叠
+            group_start = max(i - 3, 0)
+            group_end = i + 1
+            current_size = group_end - group_start - 1
+            for j in range(group_start, group_end):
+                current_size += lengths[j]
+        elif current_size > 0:
+            group_end = i + 1
+            current_size += size + 1
+        else:
+            group_start = i
+            group_end = i + 1
+            current_size = size
+            
+    if current_size > 0:
+        starts[count] = group_start
+        ends[count] = group_end
+        oversized[count] = False
+        count += 1
+        
+    return count
+
+
+_pack_sentences_jit = _njit(cache=True)(_pack_sentences) if _njit is not None else None
+
+
+def _sentence_chunk_bounds(sentences: List[str], max_size: int):
+    """
+    计算句子列表分块后各块包含的句子范围
+    
+    Args:
+        sentences: 句子列表
+        max_size: 最大块大小
+        
+    Returns:
+        [(起始下标, 结束下标, 是否超长句子), ...]
+    """
+    n = len(sentences)
+    lengths = [len(sentence) for sentence in sentences]
+    
+    # 超长句子之前可能还有一个块，输出数量最多为句子数的两倍
+    if _pack_sentences_jit is not None:
+        starts = np.empty(2 * n, dtype=np.int64)
+        ends = np.empty(2 * n, dtype=np.int64)
+        oversized = np.empty(2 * n, dtype=np.bool_)
+        count = _pack_sentences_jit(np.asarray(lengths, dtype=np.int64), max_size, starts, ends, oversized)
+        starts, ends, oversized = starts.tolist(), ends.tolist(), oversized.tolist()
+    else:
+        starts = [0] * (2 * n)
+        ends = [0] * (2 * n)
+        oversized = [False] * (2 * n)
+        count = _pack_sentences(lengths, max_size, starts, ends, oversized)
+        
+    return [(starts[k], ends[k], oversized[k]) for k in range(count)]
+
+
+def _paragraph_chunk_bounds(text: str, max_size: int):
+    """
+    计算按空行分段后各块在原文中的位置
+    
+    Args:
+        text: 文本内容
+        max_size: 最大块大小
+        
+    Returns:
+        [(起始偏移, 结束偏移, 是否超长段落), ...]，text[起始:结束]即为块内容
+    """
+    # 一次扫描记录各段落的偏移，结果与text.split('\n\n')一致
+    offsets = []
+    start = 0
+    find = text.find
+    while True:
+        end = find('\n\n', start)
+        if end < 0:
+            offsets.append((start, len(text)))
+            break
+        offsets.append((start, end))
+        start = end + 2
+        
+    n = len(offsets)
+    lengths = [end - start for start, end in offsets]
+    
+    # 超长段落之前可能还有一个块，输出数量最多为段落数的两倍
+    if _pack_paragraphs_jit is not None:
+        starts = np.empty(2 * n, dtype=np.int64)
+        ends = np.empty(2 * n, dtype=np.int64)
+        oversized = np.empty(2 * n, dtype=np.bool_)
+        count = _pack_paragraphs_jit(np.asarray(lengths, dtype=np.int64), max_size, starts, ends, oversized)
+        starts, ends, oversized = starts.tolist(), ends.tolist(), oversized.tolist()
+    else:
+        starts = [0] * (2 * n)
+        ends = [0] * (2 * n)
+        oversized = [False] * (2 * n)
+        count = _pack_paragraphs(lengths, max_size, starts, ends, oversized)
+        
+    return [
+        (offsets[starts[k]][0], offsets[ends[k] - 1][1], oversized[k])
+        for k in range(count)
+    ]
+
+
+@functools.lru_cache(maxsize=2)
+def _get_md_converter(enable_plugins: bool = True) -> "markitdown.MarkItDown":
+    """
+    获取共享的MarkItDown转换器，插件只在首次创建时加载
+    
+    Args:
+        enable_plugins: 是否启用插件
+        
+    Returns:
+        MarkItDown转换器
+    """
+    return markitdown.MarkItDown(enable_plugins=enable_plugins)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_jieba_analyse():
+    """
+    获取jieba关键词提取模块，只在首次调用时尝试导入
+    
+    Returns:
+        jieba.analyse模块，未安装jieba时返回None
+    """
+    try:
+        import jieba.analyse
+    except ImportError:
+        return None
+    return jieba.analyse
+
+
+@functools.lru_cache(maxsize=8)
+def _get_native_splitter(max_size: int, overlap_size: int):
+    """
+    获取指定块大小和重叠大小的原生文本分割器，同一参数只创建一次
+    
+    Args:
+        max_size: 最大块大小（字符数）
+        overlap_size: 重叠大小
+        
+    Returns:
+        semantic_text_splitter.TextSplitter实例
+    """
+    return _NativeTextSplitter(max_size, overlap=overlap_size)
+
+
+@functools.lru_cache(maxsize=32)
+def _heading_marker_re(heading_markers: Tuple[str, ...]) -> Optional["re.Pattern"]:
+    """
+    将一组标题前缀合并为一个锚定在行首的正则，相同的前缀组合只编译一次
+    
+    Args:
+        heading_markers: 标题标记
+        
+    Returns:
+        编译后的正则，没有标题标记时返回None
+    """
+    if heading_markers == _DEFAULT_HEADING_MARKERS:
+        return _HEADING_PREFIX_RE
+    if not heading_markers:
+        return None
+    return re.compile('^(?:' + '|'.join(re.escape(m) for m in heading_markers) + ')')
+
+
+@functools.lru_cache(maxsize=4096)
+def _generate_heading_id(heading_text: str) -> str:
+    """
+    为标题生成一个ID，用于引用
+    
+    重复出现的标题（同一文档或批量处理的多个文档中）直接返回缓存结果
+    
+    Args:
+        heading_text: 标题文本
+        
+    Returns:
+        标题ID
+    """
+    # 简化版的ID生成，将标题转为小写并替换非字母数字为连字符
+    # 移除HTML标签
+    text = _HTML_TAG_RE.sub('', heading_text)
+    # 转为小写
+    text = text.lower()
+    # 替换非字母数字字符为连字符
+    text = _HEADING_ID_CLEAN_RE.sub('-', text)
+    # 移除开头和结尾的连字符
+    return text.strip('-')
+
+
+def _drop_overlapping(accepted: List[Tuple], candidates: List[Tuple]) -> List[Tuple]:
+    """
+    过滤掉与已接受区间重叠的候选区间
+    
+    两个列表都按开始位置排序且各自内部互不重叠，因此只需一次双指针扫描
+    
+    Args:
+        accepted: 已接受的区间，元素以(开始位置, 结束位置, ...)开头
+        candidates: 候选区间，格式同上
+        
+    Returns:
+        不与任何已接受区间重叠的候选区间
+    """
+    kept = []
+    j = 0
+    n = len(accepted)
+    for candidate in candidates:
+        start, end = candidate[0], candidate[1]
+        # 结束于候选开始之前的区间不会再与后续候选重叠
+        while j < n and accepted[j][1] <= start:
+            j += 1
+        if j < n and accepted[j][0] < end:
+            continue
+        kept.append(candidate)
+    return kept
+
+
+def _group_matches_by_line(pattern, text: str, tag: str, groups: Dict[int, List]) -> None:
+    """
+    在整篇文本上执行一次finditer，将匹配按所在行号归组
+    
+    Args:
+        pattern: 不跨行匹配的正则表达式
+        text: 文本内容
+        tag: 附加在每个匹配上的类型标记
+        groups: 输出，{行号: [(类型标记, 匹配), ...]}，同一行内保持匹配顺序
+    """
+    line_no = 0
+    pos = 0
+    for match in pattern.finditer(text):
+        start = match.start()
+        # 匹配按位置递增，行号只需从上一个匹配处继续累计
+        line_no += text.count('\n', pos, start)
+        pos = start
+        groups.setdefault(line_no, []).append((tag, match))
+
+
+def _read_text_file(file_path: str, size: Optional[int] = None) -> str:
+    """
+    以单次按大小分配的系统调用读取UTF-8文本文件
+    
+    大文件改为内存映射后直接解码，省去一份完整的bytes副本
+    
+    Args:
+        file_path: 文件路径
+        size: 已知的文件大小（如FileValidator写入的file_size），为空时通过fstat获取
+        
+    Returns:
+        文件文本内容，换行符统一为\\n，无法解码的字节替换为U+FFFD
+    """
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if size is None:
+            size = os.fstat(fd).st_size
+        if size and size >= settings.MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8', 'replace')
+        else:
+            parts = [os.read(fd, size)] if size else []
+            # 文件可能在获取大小后增长，读到EOF为止
+            while True:
+                more = os.read(fd, 1 << 20)
+                if not more:
+                    break
+                parts.append(more)
+            data = parts[0] if len(parts) == 1 else b"".join(parts)
+            text = data.decode('utf-8', errors='replace')
+    finally:
+        os.close(fd)
+        
+    # 与文本模式open()的通用换行行为保持一致
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _collect_pdf_blocks(doc, start: int, end: int) -> Dict[str, List]:
+    """
+    按页提取PDF文本块，以列式结构（SoA）保存块文本和所在页码
+    
+    Args:
+        doc: 已打开的PyMuPDF文档
+        start: 起始页（包含）
+        end: 结束页（不包含）
+        
+    Returns:
+        {'text': [块文本, ...], 'page': [页码, ...]}
+    """
+    blocks = {'text': [], 'page': []}
+    texts = blocks['text']
+    pages = blocks['page']
+    for page_num in range(start, end):
+        # 块格式为(x0, y0, x1, y1, text, block_no, block_type)，block_type为1表示图片块
+        for block in doc.load_page(page_num).get_text("blocks"):
+            if block[6] == 0:
+                texts.append(block[4])
+                pages.append(page_num)
+    return blocks
+
+
+def _extract_pdf_page_range(file_path: str, start: int, end: int) -> Dict[str, List]:
+    """
+    在工作进程中提取PDF指定页范围的文本块
+    
+    Args:
+        file_path: PDF文件路径
+        start: 起始页（包含）
+        end: 结束页（不包含）
+        
+    Returns:
+        该页范围内的文本块（列式结构）
+    """
+    with fitz.open(file_path) as doc:
+        return _collect_pdf_blocks(doc, start, end)
+
+
+def _get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    获取共享的PDF提取进程池
+
+    守护进程（如Celery prefork工作进程）不能创建子进程，此时返回None
+
+    Returns:
+        进程池，当前进程不能创建子进程时返回None
+    """
+    global _pdf_pool
+    if multiprocessing.current_process().daemon:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, _PDF_MAX_WORKERS))
+        return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """关闭共享的PDF提取进程池，在应用或Worker退出时调用"""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 @PipelineFactory.register_processor
 class FileValidator(DocumentProcessor):
     """文件验证处理器"""
@@ -22,7 +688,10 @@ class FileValidator(DocumentProcessor):
     def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """验证文件是否有效且可处理"""
         file_path = context.get('file_path')
-        if not file_path or not os.path.exists(file_path):
+        # 一次stat同时完成存在性检查和大小获取
+        try:
+            file_stat = os.stat(file_path)
+        except (FileNotFoundError, TypeError, ValueError):
             raise ValueError(f"文件不存在: {file_path}")
             
         file_type = context.get('file_type', '').lower()
@@ -30,29 +699,120 @@ class FileValidator(DocumentProcessor):
             raise ValueError(f"不支持的文件类型: {file_type}")
             
         # 检查文件大小
-        file_size = os.path.getsize(file_path)
+        file_size = file_stat.st_size
         if file_size > settings.MAX_FILE_SIZE_BYTES:
             raise ValueError(f"文件过大: {file_size} 字节，最大支持 {settings.MAX_FILE_SIZE_BYTES} 字节")
             
-        # 更新上下文
+        # 更新上下文，保留stat结果供后续处理器使用（如修改时间）
         context['file_size'] = file_size
+        context['file_stat'] = file_stat
         context['validation_passed'] = True
         
         logger.info(f"文件验证通过: {file_path}, 类型: {file_type}, 大小: {file_size} 字节")
         return context
 
 
+# 影响处理结果的上下文输入，纳入管道缓存键
+# 文件校验写入的file_stat、file_size等随inode、访问时间变化，不能纳入缓存键
+_PIPELINE_CACHE_INPUT_KEYS = (
+    'metadata',
+    'convert_to_markdown',
+    'datasource_name',
+    'query',
+    'embed_metadata_in_chunks',
+    'incremental_update',
+    'old_content',
+)
+
+
+@PipelineFactory.register_processor
+class PipelineCacheLoader(DocumentProcessor):
+    """管道结果缓存读取处理器，命中时直接填充上次的处理结果并跳过后续处理器"""
+    
+    # 不按文件类型自动加入管道，由PipelineFactory在启用缓存时显式添加
+    SUPPORTED_TYPES = []
+    
+    def __init__(self, processor_names: Optional[List[str]] = None, cache: Optional[PipelineCache] = None):
+        """
+        初始化缓存读取处理器
+        
+        Args:
+            processor_names: 管道中的处理器名称，作为缓存键的一部分
+            cache: 管道结果缓存
+        """
+        self.processor_names = processor_names or []
+        self.cache = cache or PipelineCache()
+    
+    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """查找缓存的处理结果"""
+        file_path = context.get('file_path')
+        file_type = context.get('file_type', '').lower()
+        
+        # 处理选项（如convert_to_markdown）和文档元数据都会影响输出，纳入缓存键
+        options = {k: context[k] for k in _PIPELINE_CACHE_INPUT_KEYS if k in context}
+        try:
+            cache_key = PipelineCache.compute_key(file_path, file_type, options, self.processor_names)
+        except OSError as e:
+            logger.warning(f"计算管道缓存键失败: {str(e)}")
+            return context
+            
+        outputs = self.cache.get(cache_key)
+        if outputs is not None:
+            context.update(outputs)
+            context['pipeline_cache_hit'] = True
+            context['_short_circuit'] = True
+            logger.info(f"命中管道结果缓存: {file_path}")
+            return context
+            
+        # 记录输入字段，保存结果时只保存处理器产生的字段
+        context['_cache_key'] = cache_key
+        context['_cache_input_keys'] = list(context.keys())
+        return context
+
+
+@PipelineFactory.register_processor
+class PipelineCacheStore(DocumentProcessor):
+    """管道结果缓存写入处理器，放在管道末尾保存本次处理结果"""
+    
+    SUPPORTED_TYPES = []
+    
+    def __init__(self, cache: Optional[PipelineCache] = None):
+        """
+        初始化缓存写入处理器
+        
+        Args:
+            cache: 管道结果缓存
+        """
+        self.cache = cache or PipelineCache()
+    
+    def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """保存处理结果"""
+        cache_key = context.pop('_cache_key', None)
+        input_keys = set(context.pop('_cache_input_keys', ()))
+        if cache_key is None:
+            return context
+            
+        outputs = {
+            k: v for k, v in context.items()
+            if k not in input_keys and not k.startswith('_')
+        }
+        self.cache.set(cache_key, outputs)
+        return context
+
+
 @PipelineFactory.register_processor
 class MarkItDownProcessor(DocumentProcessor):
     """通用MarkItDown文档处理器，适用于多种文档格式"""
     
     # 支持更多格式，包括HTML、RTF等MarkItDown支持的格式
     SUPPORTED_TYPES = ['pdf', 'md', 'markdown', 'docx', 'txt', 'html', 'htm', 'rtf', 'odt', 'pptx']
+    # 无需转换即可作为Markdown使用的格式
+    NATIVE_TEXT_TYPES = ('md', 'markdown', 'txt')
     
     def __init__(self):
         """初始化MarkItDown处理器"""
         super().__init__()
-        self.markitdown_converter = markitdown.MarkItDown(enable_plugins=True)
+        self.markitdown_converter = _get_md_converter()
     
     def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """使用MarkItDown处理文档，转换为标准Markdown格式"""
@@ -65,11 +825,20 @@ class MarkItDownProcessor(DocumentProcessor):
         try:
             # 检查是否需要转换为Markdown
             if context.get('convert_to_markdown', True):
+                # Markdown和纯文本本身即为目标格式，直接读取，无需经过转换器
+                if file_type in self.NATIVE_TEXT_TYPES:
+                    markdown_content = _read_text_file(file_path)
+                    context['markdown_content'] = markdown_content
+                    if 'text_content' not in context:
+                        context['text_content'] = markdown_content
+                    self._extract_document_structure(markdown_content, context)
+                    return context
+                
                 logger.info(f"使用MarkItDown转换文档: {file_path}")
                 
-                # 使用MarkItDown转换文件
+                # 使用MarkItDown转换文件，相同内容的文件直接复用缓存结果
                 try:
-                    markdown_content = self.markitdown_converter.convert(file_path)
+                    markdown_content = cached_convert(self.markitdown_converter, file_path, variant="plugins")
                     context['markdown_content'] = markdown_content
                     
                     # 同时提供纯文本内容，方便后续处理
@@ -93,32 +862,40 @@ class MarkItDownProcessor(DocumentProcessor):
         return context
     
     def _extract_document_structure(self, markdown_content: str, context: Dict[str, Any]):
-        """从Markdown内容中提取文档结构信息"""
-        import re
-        
-        # 提取标题
+        """从Markdown内容中提取文档结构信息，单次遍历同时识别标题、代码块和图片"""
         headings = []
-        heading_pattern = re.compile(r'^(#{1,6})\s+(.*?)$', re.MULTILINE)
-        for match in heading_pattern.finditer(markdown_content):
-            level = len(match.group(1))
-            title = match.group(2).strip()
-            headings.append((level, title))
-        
-        # 提取代码块
         code_blocks = []
-        code_pattern = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
-        for match in code_pattern.finditer(markdown_content):
-            language = match.group(1)
-            code = match.group(2)
-            code_blocks.append((language, code))
-        
-        # 提取图片
         images = []
-        image_pattern = re.compile(r'!\[(.*?)\]\((.*?)\)')
-        for match in image_pattern.finditer(markdown_content):
-            alt_text = match.group(1)
-            image_path = match.group(2)
-            images.append((alt_text, image_path))
+        
+        # 代码块状态
+        in_code = False
+        code_language = ""
+        code_lines = []
+        
+        for line in _iter_lines(markdown_content):
+            # 行首的代码块围栏，切换代码块状态；缩进的围栏按普通内容处理
+            if line.startswith('```'):
+                if not in_code:
+                    in_code = True
+                    code_language = line[3:].strip()
+                    code_lines = []
+                else:
+                    in_code = False
+                    code = '\n'.join(code_lines) + '\n' if code_lines else ""
+                    code_blocks.append((code_language, code))
+                continue
+                
+            # 代码块内的内容不参与标题和图片识别
+            if in_code:
+                code_lines.append(line)
+                continue
+            
+            self._scan_structure_line(line, headings, images)
+        
+        # 未闭合的围栏不构成代码块，其后的内容仍按普通文本识别
+        if in_code:
+            for line in code_lines:
+                self._scan_structure_line(line, headings, images)
         
         # 更新上下文
         context['document_structure'] = {
@@ -128,6 +905,18 @@ class MarkItDownProcessor(DocumentProcessor):
         }
         
         return context
+    
+    @staticmethod
+    def _scan_structure_line(line: str, headings: List, images: List) -> None:
+        """识别一行中的标题和图片，结果追加到对应列表"""
+        heading_match = _HEADING_RE.match(line)
+        if heading_match:
+            level = len(heading_match.group(1))
+            title = heading_match.group(2).strip()
+            headings.append((level, title))
+        
+        if '![' in line:
+            images.extend(_IMAGE_RE.findall(line))
 
 
 @PipelineFactory.register_processor
@@ -148,19 +937,26 @@ class PDFProcessor(DocumentProcessor):
             
         file_path = context.get('file_path')
         try:
-            # 使用PyMuPDF提取文本
-            doc = fitz.open(file_path)
-            text_content = ""
-            toc = doc.get_toc()  # 获取目录
-            
-            # 提取文本
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text_content += page.get_text()
+            # 使用PyMuPDF提取文本，处理完立即释放文档占用的内存
+            with fitz.open(file_path) as doc:
+                toc = doc.get_toc()  # 获取目录
+                
+                page_count = doc.page_count
+                
+                # 大文档按页分片并行提取，小文档直接逐页提取
+                pdf_blocks = None
+                if page_count > _PDF_PARALLEL_MIN_PAGES:
+                    pdf_blocks = self._extract_blocks_parallel(file_path, page_count)
+                if pdf_blocks is None:
+                    pdf_blocks = _collect_pdf_blocks(doc, 0, page_count)
+                    
+            # 文本块结构保留给分块处理器直接使用，无需再从整段文本中切分
+            text_content = "".join(pdf_blocks['text'])
                 
             # 更新上下文
             context['text_content'] = text_content
-            context['page_count'] = len(doc)
+            context['pdf_blocks'] = pdf_blocks
+            context['page_count'] = page_count
             context['toc'] = toc if toc else []
             
             # 如果需要转换为Markdown，但MarkItDown失败，使用备用方法
@@ -173,7 +969,7 @@ class PDFProcessor(DocumentProcessor):
                 except Exception as e:
                     logger.error(f"PDF备用转换失败: {str(e)}")
                     
-            logger.info(f"PDF处理完成: {file_path}, 页数: {len(doc)}")
+            logger.info(f"PDF处理完成: {file_path}, 页数: {page_count}")
             
         except Exception as e:
             logger.error(f"PDF处理失败: {str(e)}")
@@ -181,25 +977,68 @@ class PDFProcessor(DocumentProcessor):
             
         return context
     
+    def _extract_blocks_parallel(self, file_path: str, page_count: int) -> Optional[Dict[str, List]]:
+        """
+        使用共享进程池按页范围并行提取PDF文本块
+        
+        Args:
+            file_path: PDF文件路径
+            page_count: 总页数
+            
+        Returns:
+            按页序合并的文本块（列式结构），无法并行时返回None
+        """
+        workers = min(os.cpu_count() or 1, _PDF_MAX_WORKERS, page_count // _PDF_PAGES_PER_WORKER)
+        if workers <= 1:
+            return None
+            
+        executor = _get_pdf_pool()
+        if executor is None:
+            logger.info(f"当前进程不能创建子进程，PDF逐页提取: {file_path}")
+            return None
+            
+        # 将页码均匀划分为连续的分片
+        shard_size = -(-page_count // workers)
+        ranges = [(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)]
+        
+        try:
+            futures = [
+                executor.submit(_extract_pdf_page_range, file_path, start, end)
+                for start, end in ranges
+            ]
+            # 按提交顺序收集结果，保持页序
+            blocks = {'text': [], 'page': []}
+            for future in futures:
+                shard = future.result()
+                blocks['text'].extend(shard['text'])
+                blocks['page'].extend(shard['page'])
+            return blocks
+        except Exception as e:
+            # 工作进程异常退出后进程池不可再用，丢弃以便下次重新创建
+            if isinstance(e, BrokenProcessPool):
+                shutdown_pdf_pool()
+            logger.warning(f"PDF并行提取失败，回退到逐页提取: {file_path}, {str(e)}")
+            return None
+    
     def _convert_to_basic_markdown(self, text: str, toc: List) -> str:
         """简单地将文本转换为Markdown格式"""
         # 如果有目录，创建Markdown标题
-        md_content = ""
+        md_parts = []
         if toc:
-            md_content += "# 文档目录\n\n"
+            md_parts.append("# 文档目录\n\n")
             for level, title, page in toc:
                 indent = "  " * (level - 1)
-                md_content += f"{indent}- {title} (页码: {page})\n"
-            md_content += "\n\n# 文档内容\n\n"
+                md_parts.append(f"{indent}- {title} (页码: {page})\n")
+            md_parts.append("\n\n# 文档内容\n\n")
         
         # 添加文本内容，按段落分割
         paragraphs = text.split("\n\n")
         for para in paragraphs:
             para = para.strip()
             if para:
-                md_content += para + "\n\n"
+                md_parts.append(para + "\n\n")
         
-        return md_content
+        return "".join(md_parts)
 
 
 @PipelineFactory.register_processor
@@ -219,26 +1058,56 @@ class DocxProcessor(DocumentProcessor):
             return context
             
         file_path = context.get('file_path')
+        
+        # 需要Markdown时只转换一次，纯文本从Markdown结果派生，避免重复解析docx；
+        # MarkItDown处理器已转换失败时不再重试，直接使用python-docx提取
+        if context.get('convert_to_markdown', True) and not context.get('markdown_conversion_failed'):
+            try:
+                markdown_content = self._convert_to_markdown(file_path)
+                context['markdown_content'] = markdown_content
+                context['text_content'] = self._markdown_to_text(markdown_content)
+                context['paragraph_count'] = sum(
+                    1 for block in markdown_content.split('\n\n') if block.strip()
+                )
+                logger.info(f"Word文档处理完成: {file_path}, 段落数: {context['paragraph_count']}")
+                return context
+            except Exception as e:
+                logger.warning(f"Word转Markdown失败，回退到python-docx提取: {str(e)}")
+        
         try:
             # 使用python-docx提取文本
             doc = docx.Document(file_path)
-            text_content = "\n".join([para.text for para in doc.paragraphs])
+            # doc.paragraphs每次访问都会重新遍历XML，只遍历一次并只保留段落文本
+            texts = [para.text for para in doc.paragraphs]
+            text_content = "\n".join(texts)
             
             # 更新上下文
             context['text_content'] = text_content
-            context['paragraph_count'] = len(doc.paragraphs)
-            
-            # 如果需要转换为Markdown，可以在这里调用MarkItDown
-            if context.get('convert_to_markdown', True):
-                context['markdown_content'] = self._convert_to_markdown(file_path)
+            context['paragraph_count'] = len(texts)
                 
-            logger.info(f"Word文档处理完成: {file_path}, 段落数: {len(doc.paragraphs)}")
+            logger.info(f"Word文档处理完成: {file_path}, 段落数: {len(texts)}")
             
         except Exception as e:
             logger.error(f"Word文档处理失败: {str(e)}")
             raise
             
         return context
+    
+    def _markdown_to_text(self, markdown_content: str) -> str:
+        """
+        去除Markdown标记得到纯文本
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            纯文本内容
+        """
+        text = _MD_HEADING_MARK_RE.sub('', markdown_content)
+        text = _MD_LINK_RE.sub(r'\1', text)
+        text = _MD_CODE_SPAN_RE.sub(r'\1', text)
+        text = _MD_STRONG_RE.sub(r'\1\2', text)
+        return _MD_EM_RE.sub(r'\1', text)
         
     def _convert_to_markdown(self, file_path: str) -> str:
         """
@@ -251,9 +1120,8 @@ class DocxProcessor(DocumentProcessor):
             Markdown内容
         """
         try:
-            # 使用MarkItDown转换
-            md_content = markitdown.markitdown(file_path)
-            return md_content
+            # 使用MarkItDown转换，相同内容的文件复用缓存结果
+            return cached_convert(_get_md_converter(), file_path, variant="plugins")
         except Exception as e:
             logger.error(f"Word转Markdown失败: {str(e)}")
             raise
@@ -273,8 +1141,7 @@ class MarkdownProcessor(DocumentProcessor):
         file_path = context.get('file_path')
         try:
             # 读取Markdown文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                markdown_content = f.read()
+            markdown_content = _read_text_file(file_path, context.get('file_size'))
                 
             # 更新上下文
             context['text_content'] = markdown_content
@@ -303,8 +1170,7 @@ class TextProcessor(DocumentProcessor):
         file_path = context.get('file_path')
         try:
             # 读取文本文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+            text_content = _read_text_file(file_path, context.get('file_size'))
                 
             # 更新上下文
             context['text_content'] = text_content
@@ -336,7 +1202,11 @@ class ChunkingProcessor(DocumentProcessor):
         if file_type in ['md', 'markdown']:
             chunks = self._chunk_markdown(text_content)
         elif file_type == 'pdf':
-            chunks = self._chunk_pdf(text_content)
+            pdf_blocks = context.get('pdf_blocks')
+            if pdf_blocks:
+                chunks = self._chunk_pdf_from_blocks(pdf_blocks)
+            else:
+                chunks = self._chunk_pdf(text_content)
         else:
             chunks = self._chunk_text(text_content)
             
@@ -365,7 +1235,9 @@ class ChunkingProcessor(DocumentProcessor):
     
     def _parse_markdown_structure(self, text: str) -> Dict[str, Any]:
         """
-        解析Markdown文档结构
+        解析Markdown文档结构，相同文本直接返回缓存的解析结果
+        
+        返回的结构在多次调用间共享，调用方不应修改
         
         Args:
             text: Markdown文本
@@ -373,8 +1245,40 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             文档结构字典，包含标题层级树和特殊内容块
         """
-        import re
+        global _structure_cache_chars
+        size = len(text)
+        if size > _STRUCTURE_CACHE_MAX_DOC_CHARS:
+            return self._parse_markdown_structure_impl(text)
+            
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with _structure_cache_lock:
+            entry = _structure_cache.get(key)
+            if entry is not None:
+                _structure_cache.move_to_end(key)
+                return entry[0]
+                
+        structure = self._parse_markdown_structure_impl(text)
+        
+        with _structure_cache_lock:
+            if key not in _structure_cache:
+                _structure_cache[key] = (structure, size)
+                _structure_cache_chars += size
+            while (len(_structure_cache) > _STRUCTURE_CACHE_SIZE
+                   or _structure_cache_chars > _STRUCTURE_CACHE_MAX_CHARS):
+                _, (_, evicted_size) = _structure_cache.popitem(last=False)
+                _structure_cache_chars -= evicted_size
+        return structure
+    
+    def _parse_markdown_structure_impl(self, text: str) -> Dict[str, Any]:
+        """
+        解析Markdown文档结构
         
+        Args:
+            text: Markdown文本
+            
+        Returns:
+            文档结构字典，包含标题层级树和特殊内容块
+        """
         # 结构对象
         structure = {
             'headings': [],  # 标题及其层级
@@ -386,9 +1290,6 @@ class ChunkingProcessor(DocumentProcessor):
         # 分割成行
         lines = text.split('\n')
         
-        # 标题正则表达式
-        heading_pattern = re.compile(r'^(#{1,6})\s+(.*?)$')
-        
         # 代码块识别
         in_code_block = False
         code_block_start = 0
@@ -400,18 +1301,15 @@ class ChunkingProcessor(DocumentProcessor):
         table_start = 0
         
         # 列表识别
-        list_pattern = re.compile(r'^\s*(?:[*+-]|\d+\.)\s')
         in_list = False
         list_items = []
         list_start = 0
         
-        # 引用关系识别模式 - 新增
-        # 1. Markdown链接格式 [text](url)
-        link_pattern = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
-        # 2. 引用格式 [ref: xxx] 或 [[xxx]]
-        ref_pattern = re.compile(r'\[ref:([^\]]+)\]|\[\[([^\]]+)\]\]')
-        # 3. 中文引用格式 如「参见：xxx」
-        cn_ref_pattern = re.compile(r'[「『]参见[:：]([^」』]+)[」』]')
+        # 引用关系识别 - 新增
+        # 每种引用格式在整篇文本上只扫描一次，按行号归组：{行号: [(类型, 匹配), ...]}
+        refs_by_line = {}
+        for ref_type, pattern in (('link', _LINK_RE), ('reference', _REF_RE), ('cn_reference', _CN_REF_RE)):
+            _group_matches_by_line(pattern, text, ref_type, refs_by_line)
         
         current_section = {
             'level': 0,  # 顶级
@@ -424,23 +1322,27 @@ class ChunkingProcessor(DocumentProcessor):
         }
         
         section_stack = [current_section]
+        # 当前段落的内容行，段落结束时再拼接，避免逐行字符串拼接
+        content_lines = []
         
         # 标题ID映射，用于引用解析
         heading_id_map = {}  # 标题文本到ID的映射
+        # 标题ID及小写标题文本到标题下标的映射，随标题解析逐步建立，每个标题只转换一次小写
+        id_to_heading = {}
         
         # 遍历每一行
         for i, line in enumerate(lines):
-            # 检查是否是标题行
-            heading_match = heading_pattern.match(line)
+            # 每行只去除一次首尾空白，后续分类都基于首字符等廉价判断
+            stripped = line.strip()
             
             # 处理代码块
-            if line.strip().startswith("```"):
+            if stripped.startswith("```"):
                 if not in_code_block:
                     # 代码块开始
                     in_code_block = True
                     code_block_start = i
                     # 提取语言
-                    code_block_language = line.strip()[3:].strip()
+                    code_block_language = stripped[3:].strip()
                 else:
                     # 代码块结束
                     in_code_block = False
@@ -457,8 +1359,11 @@ class ChunkingProcessor(DocumentProcessor):
             if in_code_block:
                 continue
                 
+            # 检查是否是标题行，只有以#开头的行才需要正则匹配
+            heading_match = _HEADING_RE.match(line) if line.startswith('#') else None
+            
             # 处理表格
-            if line.strip().startswith("|") and line.strip().endswith("|"):
+            if stripped.startswith("|") and stripped.endswith("|"):
                 if not in_table:
                     # 表格开始
                     in_table = True
@@ -479,8 +1384,13 @@ class ChunkingProcessor(DocumentProcessor):
                     })
                 table_rows = []
                 
-            # 处理列表
-            list_match = list_pattern.match(line)
+            # 处理列表，首个非空白字符是列表标记或数字时才需要正则匹配
+            first_char = stripped[:1]
+            list_match = (
+                _LIST_ITEM_RE.match(line)
+                if first_char and (first_char in '*+-' or first_char.isdigit())
+                else None
+            )
             if list_match:
                 if not in_list:
                     # 列表开始
@@ -490,7 +1400,7 @@ class ChunkingProcessor(DocumentProcessor):
                 else:
                     # 继续列表
                     list_items.append(line)
-            elif in_list and line.strip() == "":
+            elif in_list and stripped == "":
                 # 暂时保持列表状态，可能是列表项之间的空行
                 list_items.append(line)
             elif in_list:
@@ -505,73 +1415,55 @@ class ChunkingProcessor(DocumentProcessor):
                 list_items = []
                 
             # 处理引用关系 - 新增
-            # 检查Markdown链接
-            for match in link_pattern.finditer(line):
-                link_text = match.group(1)
-                link_url = match.group(2)
-                
-                # 判断是否是内部引用(以#开头的锚点)
-                if link_url.startswith('#'):
-                    ref_id = link_url[1:]  # 去掉#号
+            # 引用已在整篇文本上预先扫描，这里只处理该行命中的结果
+            for ref_type, match in refs_by_line.get(i, ()):
+                if ref_type == 'link':
+                    link_text = match.group(1)
+                    link_url = match.group(2)
+                    
+                    # 判断是否是内部引用(以#开头的锚点)
+                    if link_url.startswith('#'):
+                        ref_id = link_url[1:]  # 去掉#号
+                        structure['references'].append({
+                            'type': 'internal',
+                            'source': {
+                                'line': i,
+                                'section': current_section['title'],
+                                'context': line
+                            },
+                            'target': ref_id,
+                            'text': link_text
+                        })
+                        
+                        # 添加到当前段落的引用中
+                        current_section['refs'].append({
+                            'type': 'internal',
+                            'target': ref_id,
+                            'text': link_text
+                        })
+                else:
+                    # [ref: xxx]、[[xxx]] 或中文引用格式
+                    if ref_type == 'reference':
+                        ref_text = match.group(1) if match.group(1) else match.group(2)
+                    else:
+                        ref_text = match.group(1)
                     structure['references'].append({
-                        'type': 'internal',
+                        'type': ref_type,
                         'source': {
                             'line': i,
                             'section': current_section['title'],
                             'context': line
                         },
-                        'target': ref_id,
-                        'text': link_text
+                        'target': ref_text,
+                        'text': ref_text
                     })
                     
                     # 添加到当前段落的引用中
                     current_section['refs'].append({
-                        'type': 'internal',
-                        'target': ref_id,
-                        'text': link_text
+                        'type': ref_type,
+                        'target': ref_text,
+                        'text': ref_text
                     })
-            
-            # 检查引用格式 [ref: xxx] 或 [[xxx]]
-            for match in ref_pattern.finditer(line):
-                ref_text = match.group(1) if match.group(1) else match.group(2)
-                structure['references'].append({
-                    'type': 'reference',
-                    'source': {
-                        'line': i,
-                        'section': current_section['title'],
-                        'context': line
-                    },
-                    'target': ref_text,
-                    'text': ref_text
-                })
-                
-                # 添加到当前段落的引用中
-                current_section['refs'].append({
-                    'type': 'reference',
-                    'target': ref_text,
-                    'text': ref_text
-                })
-            
-            # 检查中文引用格式
-            for match in cn_ref_pattern.finditer(line):
-                ref_text = match.group(1)
-                structure['references'].append({
-                    'type': 'cn_reference',
-                    'source': {
-                        'line': i,
-                        'section': current_section['title'],
-                        'context': line
-                    },
-                    'target': ref_text,
-                    'text': ref_text
-                })
-                
-                # 添加到当前段落的引用中
-                current_section['refs'].append({
-                    'type': 'cn_reference',
-                    'target': ref_text,
-                    'text': ref_text
-                })
                 
             # 处理标题和段落结构
             if heading_match:
@@ -579,11 +1471,16 @@ class ChunkingProcessor(DocumentProcessor):
                 title = heading_match.group(2).strip()
                 
                 # 生成标题ID (用于引用解析)
-                heading_id = self._generate_heading_id(title)
-                heading_id_map[title.lower()] = heading_id
+                heading_id = _generate_heading_id(title)
+                title_key = title.lower()
+                heading_id_map[title_key] = heading_id
+                id_to_heading[heading_id] = len(structure['headings'])
+                id_to_heading[title_key] = len(structure['headings'])
                 
-                # 保存当前段落
-                if current_section['content'].strip():
+                # 保存当前段落（isspace判断非空白，避免strip生成副本）
+                current_section['content'] = '\n'.join(content_lines)
+                content_lines = []
+                if current_section['content'] and not current_section['content'].isspace():
                     current_section['end_line'] = i - 1
                 
                 # 创建新的段落
@@ -610,14 +1507,15 @@ class ChunkingProcessor(DocumentProcessor):
                 section_stack.append(new_section)
                 current_section = new_section
             else:
-                # 普通内容行，添加到当前段落
-                if current_section['content']:
-                    current_section['content'] += '\n' + line
+                # 普通内容行，添加到当前段落（空行开头的内容会被后续行替换）
+                if content_lines and content_lines[0]:
+                    content_lines.append(line)
                 else:
-                    current_section['content'] = line
+                    content_lines = [line]
         
         # 处理最后一个段落
-        if current_section['content'].strip():
+        current_section['content'] = '\n'.join(content_lines)
+        if current_section['content'] and not current_section['content'].isspace():
             current_section['end_line'] = len(lines) - 1
         
         # 处理可能未关闭的特殊块
@@ -650,66 +1548,42 @@ class ChunkingProcessor(DocumentProcessor):
         structure['sections'] = section_stack[0]['subsections']
         
         # 引用解析 - 将引用与实际标题关联起来
-        self._resolve_references(structure, heading_id_map)
+        self._resolve_references(structure, heading_id_map, id_to_heading)
         
         return structure
     
-    def _generate_heading_id(self, heading_text: str) -> str:
-        """
-        为标题生成一个ID，用于引用
-        
-        Args:
-            heading_text: 标题文本
-            
-        Returns:
-            标题ID
-        """
-        # 简化版的ID生成，将标题转为小写并替换非字母数字为连字符
-        import re
-        # 移除HTML标签
-        text = re.sub(r'<[^>]+>', '', heading_text)
-        # 转为小写
-        text = text.lower()
-        # 替换非字母数字字符为连字符
-        text = re.sub(r'[^a-z0-9\u4e00-\u9fa5]+', '-', text)
-        # 移除开头和结尾的连字符
-        text = text.strip('-')
-        return text
-    
-    def _resolve_references(self, structure: Dict[str, Any], heading_id_map: Dict[str, str]):
+    def _resolve_references(
+        self,
+        structure: Dict[str, Any],
+        heading_id_map: Dict[str, str],
+        id_to_heading: Dict[str, int]
+    ):
         """
         解析引用关系，将引用与实际标题关联
         
         Args:
             structure: 文档结构
-            heading_id_map: 标题到ID的映射
+            heading_id_map: 小写标题文本到ID的映射
+            id_to_heading: 标题ID及小写标题文本到标题下标的映射
         """
-        # 反向映射：ID到标题索引
-        id_to_heading = {}
-        for i, (level, title, line, heading_id) in enumerate(structure['headings']):
-            id_to_heading[heading_id] = i
-            id_to_heading[title.lower()] = i  # 同时支持按标题文本查找
-        
         # 解析每个引用
+        # 同一目标在文档中常被多次引用，按目标文本缓存解析结果
+        resolved_targets = {}
         resolved_refs = []
         for ref in structure['references']:
             target = ref['target']
-            
-            # 尝试查找目标标题
-            target_id = None
-            target_index = -1
-            
-            # 1. 直接匹配ID
-            if target in id_to_heading:
-                target_index = id_to_heading[target]
-            # 2. 匹配标题文本
-            elif target.lower() in id_to_heading:
-                target_index = id_to_heading[target.lower()]
-            # 3. 通过标题文本获取ID
-            elif target.lower() in heading_id_map:
-                target_id = heading_id_map[target.lower()]
-                if target_id in id_to_heading:
-                    target_index = id_to_heading[target_id]
+            target_index = resolved_targets.get(target)
+            if target_index is None:
+                # 1. 直接匹配ID
+                target_index = id_to_heading.get(target, -1)
+                if target_index < 0:
+                    target_key = target.lower()
+                    # 2. 匹配标题文本
+                    target_index = id_to_heading.get(target_key, -1)
+                    # 3. 通过标题文本获取ID
+                    if target_index < 0 and target_key in heading_id_map:
+                        target_index = id_to_heading.get(heading_id_map[target_key], -1)
+                resolved_targets[target] = target_index
             
             # 找到匹配的标题
             if target_index >= 0:
@@ -751,38 +1625,36 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             分块列表
         """
-        chunks = []
-        max_chunk_size = settings.MAX_CHUNK_SIZE
-        
-        # 处理特殊块
-        special_blocks_map = {}
-        for block in structure['special_blocks']:
-            # 创建行号到特殊块的映射
-            for line_num in range(block['start_line'], block['end_line'] + 1):
-                special_blocks_map[line_num] = block
+        # 分块与引用上下文处理逐块流水进行，只在最后生成一份分块列表
+        processed_chunks = list(
+            self._process_reference_contexts(self._iter_structure_chunks(structure), structure)
+        )
         
-        # 引用映射: 标题ID到被引用计数
-        ref_count_map = {}
-        ref_source_map = {}  # 源引用到目标引用的映射
+        # 如果没有结构化的块，则回退到基本分块
+        if not processed_chunks:
+            return self._chunk_by_headings(structure.get('raw_text', ''), ['# ', '## ', '### '])
         
-        # 统计引用次数
-        for ref in structure['references']:
-            if ref.get('resolved', False):
-                target_id = ref['target']['id']
-                ref_count_map[target_id] = ref_count_map.get(target_id, 0) + 1
-                
-                # 记录源位置
-                source_section = ref['source']['section']
-                if source_section not in ref_source_map:
-                    ref_source_map[source_section] = []
-                ref_source_map[source_section].append(ref)
+        return processed_chunks
+    
+    def _iter_structure_chunks(self, structure: Dict[str, Any]) -> Iterator[str]:
+        """
+        按文档顺序逐个生成基于结构的初步分块
         
-        # 递归处理段落
-        def process_section(section, parent_titles=None, is_referenced=False):
-            nonlocal chunks
+        Args:
+            structure: 文档结构字典
             
-            if parent_titles is None:
-                parent_titles = []
+        Yields:
+            初步分块
+        """
+        max_chunk_size = settings.MAX_CHUNK_SIZE
+        
+        # 引用映射: 标题ID到被引用计数
+        ref_count_map = self._count_resolved_targets(structure)
+        
+        # 使用显式栈按深度优先顺序处理段落，栈元素为(段落, 父级标题列表, 是否被引用)
+        stack = deque((section, [], False) for section in reversed(structure.get('sections', [])))
+        while stack:
+            section, parent_titles, is_referenced = stack.pop()
             
             # 创建当前块的标题上下文
             current_titles = parent_titles.copy()
@@ -825,63 +1697,68 @@ class ChunkingProcessor(DocumentProcessor):
                 # 检查内容大小
                 if len(full_content) <= max_chunk_size:
                     # 直接作为一个块
-                    chunks.append(full_content)
+                    yield full_content
                 else:
                     # 需要进一步分割，使用更智能的结构感知分割
                     content_chunks = self._structure_aware_split(content)
                     for i, chunk in enumerate(content_chunks):
                         # 只给第一个块添加完整元数据
                         if i == 0:
-                            chunks.append(title_prefix + metadata + chunk)
+                            yield title_prefix + metadata + chunk
                         else:
                             # 其他块只添加标题路径，避免重复
-                            chunks.append(title_prefix + chunk)
+                            yield title_prefix + chunk
             
-            # 递归处理子段落
-            for subsection in section.get('subsections', []):
+            # 子段落逆序入栈，保证按文档顺序出栈处理
+            for subsection in reversed(section.get('subsections', [])):
                 # 检查该子段落是否被引用
                 subsection_is_referenced = section_is_referenced
                 if not subsection_is_referenced and 'heading_id' in subsection:
                     subsection_is_referenced = ref_count_map.get(subsection['heading_id'], 0) > 0
                 
-                process_section(subsection, current_titles, subsection_is_referenced)
-        
-        # 处理文档的顶级段落
-        for section in structure.get('sections', []):
-            process_section(section)
-        
-        # 后处理：处理引用关系
-        processed_chunks = self._process_reference_contexts(chunks, structure['references'])
-        
-        # 如果没有结构化的块，则回退到基本分块
-        if not processed_chunks:
-            return self._chunk_by_headings(structure.get('raw_text', ''), ['# ', '## ', '### '])
-        
-        return processed_chunks
+                stack.append((subsection, current_titles, subsection_is_referenced))
+
+    
+    def _count_resolved_targets(self, structure: Dict[str, Any]) -> Dict[str, int]:
+        """
+        统计每个标题ID被引用的次数
         
-    def _process_reference_contexts(self, chunks: List[str], references: List[Dict]) -> List[str]:
+        Args:
+            structure: 文档结构
+            
+        Returns:
+            标题ID到被引用次数的映射
+        """
+        return Counter(
+            ref['target']['id']
+            for ref in structure['references']
+            if ref.get('resolved', False)
+        )
+    
+    def _process_reference_contexts(self, chunks: Iterable[str], structure: Dict[str, Any]) -> Iterator[str]:
         """
         处理引用上下文，确保相互引用的内容在语义上保持连贯
         
         Args:
-            chunks: 初步分块结果
-            references: 引用关系列表
+            chunks: 初步分块，可以是逐块生成的迭代器
+            structure: 文档结构，包含标题和引用关系
             
-        Returns:
+        Yields:
             处理后的分块
         """
         # 如果没有引用，直接返回原始分块
-        if not references:
-            return chunks
+        if not structure['references']:
+            yield from chunks
+            return
             
         # 引用计数器 - 用于识别重要引用
-        ref_importance = {}
+        ref_importance = self._count_resolved_targets(structure)
         
-        # 统计每个引用的重要性
-        for ref in references:
+        # 每个标题ID对应第一个解析到它的引用的目标，只需遍历一次引用
+        by_target = {}
+        for ref in structure['references']:
             if ref.get('resolved', False):
-                target_id = ref['target']['id']
-                ref_importance[target_id] = ref_importance.get(target_id, 0) + 1
+                by_target.setdefault(ref['target']['id'], ref['target'])
         
         # 创建重要引用的上下文映射
         ref_contexts = {}
@@ -890,55 +1767,70 @@ class ChunkingProcessor(DocumentProcessor):
         for target_id, count in ref_importance.items():
             if count >= important_threshold:
                 # 为重要引用构建上下文摘要
-                context = self._extract_reference_context(target_id, references)
+                context = self._extract_reference_context(target_id, by_target)
                 if context:
                     ref_contexts[target_id] = context
         
-        # 处理每个分块，为包含重要引用的分块添加上下文
-        result_chunks = []
+        # 重要引用较多时，用Aho-Corasick自动机一次扫描找出分块中出现的全部目标ID
+        automaton = None
+        if _ahocorasick is not None and len(ref_contexts) >= _AHOCORASICK_MIN_TARGETS:
+            automaton = _ahocorasick.Automaton()
+            for target_id in ref_contexts:
+                if target_id:
+                    automaton.add_word(target_id, target_id)
+            if len(automaton):
+                automaton.make_automaton()
+            else:
+                automaton = None
         
+        # 处理每个分块，为包含重要引用的分块添加上下文
         for chunk in chunks:
-            modified_chunk = chunk
-            
-            # 检查分块中是否包含重要引用的标记
+            # 引用标记与目标无关，不含任何标记的分块无需逐个检查目标
+            if not ref_contexts or not any(marker in chunk for marker in _REF_MARKERS):
+                yield chunk
+                continue
+                
+            found_ids = None
+            if automaton is not None:
+                found_ids = {target_id for _, target_id in automaton.iter(chunk)}
+                
+            # 分块及追加的引用上下文片段，最后一次性拼接
+            parts = [chunk]
             for target_id, context in ref_contexts.items():
-                # 检查分块中是否包含对该引用的引用
-                for ref_type in ['[ref:', '[[', '「参见']:
-                    if ref_type in chunk and target_id in chunk:
-                        # 在分块末尾添加引用上下文
-                        if not modified_chunk.endswith(context):
-                            modified_chunk += f"\n\n引用上下文: {context}"
-                        break
-            
-            result_chunks.append(modified_chunk)
+                # 检查分块中是否包含对该引用的引用（空ID与任何分块都匹配）
+                if found_ids is None:
+                    referenced = target_id in chunk
+                else:
+                    referenced = not target_id or target_id in found_ids
+                if referenced:
+                    # 在分块末尾添加引用上下文，末尾已是该上下文时跳过
+                    # 通常只需检查最后一个片段，上下文比最后片段还长时才拼接后检查
+                    last = parts[-1]
+                    if len(last) >= len(context):
+                        duplicated = last.endswith(context)
+                    else:
+                        duplicated = "".join(parts).endswith(context)
+                    if not duplicated:
+                        parts.append(f"\n\n引用上下文: {context}")
             
-        return result_chunks
+            yield parts[0] if len(parts) == 1 else "".join(parts)
         
-    def _extract_reference_context(self, target_id: str, references: List[Dict]) -> str:
+    def _extract_reference_context(self, target_id: str, by_target: Dict[str, Dict]) -> str:
         """
         提取引用目标的上下文摘要
         
         Args:
             target_id: 引用目标ID
-            references: 引用关系列表
+            by_target: 标题ID到第一个解析到该ID的引用目标的映射
             
         Returns:
             上下文摘要
         """
-        # 找到匹配的引用
-        target_refs = [ref for ref in references if ref.get('resolved', False) and ref['target']['id'] == target_id]
-        
-        if not target_refs:
+        target = by_target.get(target_id)
+        if target is None:
             return ""
             
-        # 使用第一个匹配的引用
-        ref = target_refs[0]
-        target = ref['target']
-        
-        # 提取上下文
-        context = f"{target['title']} (级别: {target['level']})"
-        
-        return context
+        return f"{target['title']} (级别: {target['level']})"
     
     def _structure_aware_split(self, text: str) -> List[str]:
         """
@@ -951,89 +1843,54 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             分割后的文本块
         """
-        import re
-        
-        # 识别文本中的结构元素
+        # 识别文本中的结构元素：(开始位置, 结束位置, 类型, 内容)
+        # 优先级为代码块 > 列表 > 表格，低优先级结构与已识别结构重叠时丢弃
+        # 同类匹配由finditer按位置产生且互不重叠，可与已识别结构线性归并
+        # 每种结构先用子串查找判断必需的标记字符是否存在，不存在时跳过对应的正则扫描
         structures = []
-        
-        # 识别代码块
-        code_pattern = re.compile(r'```[\w]*\n.*?```', re.DOTALL)
-        for match in code_pattern.finditer(text):
-            structures.append({
-                'type': 'code',
-                'start': match.start(),
-                'end': match.end(),
-                'content': match.group()
-            })
-        
-        # 识别列表
-        list_pattern = re.compile(r'(?:(?:\n|^)\s*(?:[*+-]|\d+\.)\s+.*)+', re.DOTALL)
-        for match in list_pattern.finditer(text):
-            # 检查是否与已识别的结构重叠
-            overlap = False
-            for s in structures:
-                if (match.start() < s['end'] and match.end() > s['start']):
-                    overlap = True
-                    break
-            if not overlap:
-                structures.append({
-                    'type': 'list',
-                    'start': match.start(),
-                    'end': match.end(),
-                    'content': match.group()
-                })
-        
-        # 识别表格
-        table_pattern = re.compile(r'(?:\|.*\|(?:\n|$))+', re.DOTALL)
-        for match in table_pattern.finditer(text):
-            # 检查是否与已识别的结构重叠
-            overlap = False
-            for s in structures:
-                if (match.start() < s['end'] and match.end() > s['start']):
-                    overlap = True
-                    break
-            if not overlap:
-                structures.append({
-                    'type': 'table',
-                    'start': match.start(),
-                    'end': match.end(),
-                    'content': match.group()
-                })
-        
-        # 按开始位置排序结构
-        structures.sort(key=lambda x: x['start'])
+        if '```' in text:
+            structures = [(m.start(), m.end(), 'code', m.group()) for m in _CODE_BLOCK_RE.finditer(text)]
+        # 列表项需要*、+、-之一或编号后的点，表格行需要竖线
+        has_list = '-' in text or '*' in text or '+' in text or '.' in text
+        has_table = '|' in text
+        for structure_type, pattern, present in (
+            ('list', _LIST_BLOCK_RE, has_list),
+            ('table', _TABLE_BLOCK_RE, has_table),
+        ):
+            if not present:
+                continue
+            candidates = [(m.start(), m.end(), structure_type, m.group()) for m in pattern.finditer(text)]
+            if candidates:
+                structures = list(heapq.merge(structures, _drop_overlapping(structures, candidates)))
         
         # 如果没有识别到结构，使用递归重叠分块
         if not structures:
-            return self._recursive_overlap_chunking(text, settings.MAX_CHUNK_SIZE, 100)
+            return self._split_plain_text(text, settings.MAX_CHUNK_SIZE, 100)
         
         # 构建分块
         chunks = []
         last_end = 0
         
-        for structure in structures:
+        for start, end, structure_type, structure_content in structures:
             # 处理结构前的文本
-            if structure['start'] > last_end:
-                pre_text = text[last_end:structure['start']].strip()
+            if start > last_end:
+                pre_text = text[last_end:start].strip()
                 if pre_text:
                     # 对普通文本使用递归重叠分块
-                    pre_chunks = self._recursive_overlap_chunking(pre_text, settings.MAX_CHUNK_SIZE, 100)
+                    pre_chunks = self._split_plain_text(pre_text, settings.MAX_CHUNK_SIZE, 100)
                     chunks.extend(pre_chunks)
             
-            # 处理结构本身
-            structure_content = structure['content']
-            
             # 如果结构内容超过块大小，尝试智能分割
             if len(structure_content) > settings.MAX_CHUNK_SIZE:
-                if structure['type'] == 'code':
+                if structure_type == 'code':
                     # 代码块尝试按函数/类分割
                     code_chunks = self._split_code_block(structure_content)
                     chunks.extend(code_chunks)
-                elif structure['type'] == 'list':
+                elif structure_type == 'list':
                     # 列表按项分割
                     list_chunks = self._split_list(structure_content)
                     chunks.extend(list_chunks)
-                elif structure['type'] == 'table':
+                elif structure_type == 'table':
                     # 表格可能需要特殊处理，这里简单处理
                     table_chunks = self._split_by_size(structure_content, settings.MAX_CHUNK_SIZE, 50)
                     chunks.extend(table_chunks)
@@ -1041,17 +1898,44 @@ class ChunkingProcessor(DocumentProcessor):
                 # 结构内容不大，直接作为一个块
                 chunks.append(structure_content)
             
-            last_end = structure['end']
+            last_end = end
         
         # 处理最后一部分文本
         if last_end < len(text):
             post_text = text[last_end:].strip()
             if post_text:
-                post_chunks = self._recursive_overlap_chunking(post_text, settings.MAX_CHUNK_SIZE, 100)
+                post_chunks = self._split_plain_text(post_text, settings.MAX_CHUNK_SIZE, 100)
                 chunks.extend(post_chunks)
         
         return chunks
     
+    def _split_plain_text(self, text: str, max_size: int, overlap_size: int) -> List[str]:
+        """
+        切分结构块之外的普通文本
+        
+        启用NATIVE_TEXT_SPLITTER_ENABLED且安装了semantic-text-splitter时，由其在Rust中一次完成
+        段落、句子、字符等多级边界的切分，否则使用递归重叠分块
+        
+        Args:
+            text: 文本内容
+            max_size: 最大块大小
+            overlap_size: 重叠大小
+            
+        Returns:
+            分块列表
+        """
+        if (
+            settings.NATIVE_TEXT_SPLITTER_ENABLED
+            and _NativeTextSplitter is not None
+            and 0 <= overlap_size < max_size
+        ):
+            try:
+                return _get_native_splitter(max_size, overlap_size).chunks(text)
+            except (TypeError, ValueError) as e:
+                # 不兼容的semantic-text-splitter版本构造参数不同，回退到递归重叠分块
+                logger.warning(f"semantic-text-splitter分块失败，使用递归重叠分块: {str(e)}")
+        return self._recursive_overlap_chunking(text, max_size, overlap_size)
+    
     def _recursive_overlap_chunking(self, text: str, max_size: int, overlap_size: int) -> List[str]:
         """
         递归重叠分块 - 借鉴LlamaIndex的设计思想
@@ -1073,9 +1957,11 @@ class ChunkingProcessor(DocumentProcessor):
         chunks = []
         
         # 按段落分割文本
-        paragraphs = re.split(r'\n\s*\n', text)
+        paragraphs = _PARAGRAPH_BREAK_RE.split(text)
         
-        current_chunk = ""
+        # 当前块的段落列表及拼接后的长度，输出时才拼接，避免反复拼接字符串
+        current_parts = []
+        current_size = 0
         
         for para in paragraphs:
             para = para.strip()
@@ -1087,45 +1973,43 @@ class ChunkingProcessor(DocumentProcessor):
             # 如果段落本身超过最大大小
             if len(para) > max_size:
                 # 先保存当前累积的块
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
+                if current_parts:
+                    chunks.append("\n\n".join(current_parts))
+                    current_parts = []
+                    current_size = 0
                 
-                # 大段落递归处理
-                if len(para) > max_size * 2:  # 非常大的段落
-                    # 先按句子分割
-                    sentences = self._split_into_sentences(para)
-                    # 再对句子应用递归重叠
-                    para_chunks = self._chunk_sentences_with_overlap(sentences, max_size, overlap_size)
-                else:
-                    # 中等大小的段落，直接应用句子分割
-                    para_chunks = self._split_by_sentences(para)
+                # 大段落先按句子分割，再对句子应用递归重叠
+                sentences = self._split_into_sentences(para)
+                para_chunks = self._chunk_sentences_with_overlap(sentences, max_size, overlap_size)
                 
                 chunks.extend(para_chunks)
                 continue
             
             # 如果当前块 + 新段落超过大小限制
-            if current_chunk and len(current_chunk) + len(para) + 2 > max_size:
+            if current_parts and current_size + len(para) + 2 > max_size:
                 # 保存当前块
+                current_chunk = "\n\n".join(current_parts)
                 chunks.append(current_chunk)
                 
                 # 新段落作为新块的开始，添加重叠
-                if overlap_size > 0 and len(current_chunk) > overlap_size:
+                if overlap_size > 0 and current_size > overlap_size:
                     # 从当前块的末尾提取重叠部分
                     overlap_text = self._extract_semantic_overlap(current_chunk, overlap_size)
-                    current_chunk = overlap_text + "\n\n" + para
+                    current_parts = [overlap_text, para]
+                    current_size = len(overlap_text) + 2 + len(para)
                 else:
-                    current_chunk = para
+                    current_parts = [para]
+                    current_size = len(para)
             else:
                 # 添加到当前块
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
+                if current_parts:
+                    current_size += 2
+                current_parts.append(para)
+                current_size += len(para)
         
         # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_parts:
+            chunks.append("\n\n".join(current_parts))
         
         return chunks
     
@@ -1139,27 +2023,22 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             句子列表
         """
-        import re
-        
-        # 句子结束标记正则表达式 - 支持中英文
-        sentence_end = re.compile(r'([.!?。！？；;]\s*)')
-        
-        # 分割成句子
-        sentences = sentence_end.split(text)
-        
-        # 合并句子和标点
+        # 按句子结束标记分割 - 支持中英文，每个句子包含其结尾的标点和空白
         result = []
-        for i in range(0, len(sentences)-1, 2):
-            if i+1 < len(sentences):
-                result.append(sentences[i] + sentences[i+1])
-            else:
-                result.append(sentences[i])
-        
-        # 处理最后一个元素
-        if len(sentences) % 2 == 1:
-            result.append(sentences[-1])
-        
-        return [s for s in result if s.strip()]
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(text):
+            end = match.end()
+            sentence = text[start:end]
+            if not sentence.isspace():
+                result.append(sentence)
+            start = end
+        
+        # 处理最后一个没有结束标记的部分
+        tail = text[start:]
+        if tail and not tail.isspace():
+            result.append(tail)
+        
+        return result
     
     def _chunk_sentences_with_overlap(self, sentences: List[str], max_size: int, overlap_size: int) -> List[str]:
         """
@@ -1173,42 +2052,14 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             分块列表
         """
+        # 先只根据句子长度计算每块的句子范围，再拼接各块
         chunks = []
-        current_chunk = ""
-        last_added_index = -1
-        
-        for i, sentence in enumerate(sentences):
-            # 如果单个句子就超过了最大大小
-            if len(sentence) > max_size:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-                
+        for start, end, oversized in _sentence_chunk_bounds(sentences, max_size):
+            if oversized:
                 # 分割大句子
-                sentence_parts = self._split_by_size(sentence, max_size, 0)
-                chunks.extend(sentence_parts)
-                last_added_index = i
-                continue
-            
-            # 如果当前块 + 新句子超过大小限制
-            if current_chunk and len(current_chunk) + len(sentence) + 1 > max_size:
-                chunks.append(current_chunk)
-                
-                # 确定重叠句子的开始索引
-                overlap_start = max(last_added_index - 2, 0)  # 尝试包含前两个句子
-                current_chunk = " ".join(sentences[overlap_start:i]) + " " + sentence
-                last_added_index = i
+                chunks.extend(self._split_by_size(sentences[start], max_size, 0))
             else:
-                # 添加到当前块
-                if current_chunk:
-                    current_chunk += " " + sentence
-                else:
-                    current_chunk = sentence
-                last_added_index = i
-        
-        # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
+                chunks.append(" ".join(sentences[start:end]))
         
         return chunks
     
@@ -1282,15 +2133,13 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             文本块列表
         """
-        chunks = []
-        text_len = len(text)
+        step = max_size - overlap_size
+        if step <= 0:
+            # 重叠不小于块大小时无法向前推进，退化为不重叠分割
+            step = max_size
         
-        for i in range(0, text_len, max_size - overlap_size):
-            chunk = text[i:min(i + max_size, text_len)]
-            if chunk:
-                chunks.append(chunk)
-        
-        return chunks
+        # 切片会自动截断到文本末尾，且起点均小于文本长度，块不会为空
+        return [text[i:i + max_size] for i in range(0, len(text), step)]
     
     def _split_code_block(self, code_block: str) -> List[str]:
         """
@@ -1303,11 +2152,10 @@ class ChunkingProcessor(DocumentProcessor):
             分割后的代码块
         """
         # 提取语言标识
-        import re
         language = ""
         content = code_block
         
-        match = re.match(r'```(\w*)\n(.*?)```', code_block, re.DOTALL)
+        match = _CODE_FENCE_RE.match(code_block)
         if match:
             language = match.group(1)
             content = match.group(2)
@@ -1320,19 +2168,17 @@ class ChunkingProcessor(DocumentProcessor):
         max_size = settings.MAX_CHUNK_SIZE - 8  # 为```语言和```留空间
         
         # 尝试按函数/类/模块分割
-        if language in ["python", "js", "javascript", "java", "c", "cpp", "csharp", "go", "rust"]:
-            # 函数/方法定义模式
-            func_pattern = re.compile(r'((?:def|function|func|fn|public|private|protected|class|module|interface)\s+\w+[\s\S]*?)(?=\n\s*(?:def|function|func|fn|public|private|protected|class|module|interface)\s+|\Z)', re.DOTALL)
+        if language in _CODE_UNIT_LANGUAGES:
             
             last_end = 0
-            for match in func_pattern.finditer(content):
+            for match in _CODE_UNIT_RE.finditer(content):
                 # 如果匹配内容太大，需要进一步分割
                 if match.end() - match.start() > max_size:
                     # 将大函数/类按行分割
                     func_content = match.group(1)
                     func_chunks = self._split_by_size(func_content, max_size, 100)
                     
-                    for i, chunk in enumerate(func_chunks):
+                    for chunk in func_chunks:
                         chunks.append(f"```{language}\n{chunk}```")
                 else:
                     # 处理未匹配部分
@@ -1359,20 +2205,26 @@ class ChunkingProcessor(DocumentProcessor):
         else:
             # 对于不识别的语言，按行分割
             lines = content.split('\n')
-            current_chunk = ""
+            current_lines = []
+            current_size = 0
             
             for line in lines:
-                if current_chunk and len(current_chunk) + len(line) + 1 > max_size:
-                    chunks.append(f"```{language}\n{current_chunk}```")
-                    current_chunk = line
+                if current_size and current_size + len(line) + 1 > max_size:
+                    code = '\n'.join(current_lines)
+                    chunks.append(f"```{language}\n{code}```")
+                    current_lines = [line]
+                    current_size = len(line)
                 else:
-                    if current_chunk:
-                        current_chunk += '\n' + line
+                    if current_size:
+                        current_lines.append(line)
+                        current_size += 1 + len(line)
                     else:
-                        current_chunk = line
+                        current_lines = [line]
+                        current_size = len(line)
             
-            if current_chunk:
-                chunks.append(f"```{language}\n{current_chunk}```")
+            if current_size:
+                code = '\n'.join(current_lines)
+                chunks.append(f"```{language}\n{code}```")
         
         return chunks if chunks else [code_block]
     
@@ -1386,8 +2238,6 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             分割后的列表块
         """
-        import re
-        
         # 如果列表较小，直接返回
         if len(list_text) <= settings.MAX_CHUNK_SIZE:
             return [list_text]
@@ -1396,23 +2246,25 @@ class ChunkingProcessor(DocumentProcessor):
         max_size = settings.MAX_CHUNK_SIZE
         
         # 识别列表项
-        list_pattern = re.compile(r'(?:^|\n)(\s*(?:[*+-]|\d+\.)\s+.*(?:\n\s+.*)*)', re.MULTILINE)
-        matches = list(list_pattern.finditer(list_text))
+        matches = list(_LIST_ITEM_BLOCK_RE.finditer(list_text))
         
         if not matches:
             # 如果无法识别列表项，按大小分割
             return self._split_by_size(list_text, max_size, 100)
         
-        current_chunk = ""
+        # 当前块的列表项及总长度，输出时才拼接
+        current_items = []
+        current_size = 0
         
         for match in matches:
             item = match.group(1)
             
             # 如果单个列表项就超过了最大大小
             if len(item) > max_size:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
+                if current_size:
+                    chunks.append("".join(current_items))
+                current_items = []
+                current_size = 0
                 
                 # 分割大列表项
                 item_chunks = self._split_by_size(item, max_size, 50)
@@ -1420,34 +2272,62 @@ class ChunkingProcessor(DocumentProcessor):
                 continue
             
             # 如果当前块 + 新列表项超过大小限制
-            if current_chunk and len(current_chunk) + len(item) > max_size:
-                chunks.append(current_chunk)
-                current_chunk = item
+            if current_size and current_size + len(item) > max_size:
+                chunks.append("".join(current_items))
+                current_items = [item]
+                current_size = len(item)
             else:
                 # 添加到当前块
-                if current_chunk:
-                    current_chunk += item
-                else:
-                    current_chunk = item
+                current_items.append(item)
+                current_size += len(item)
         
         # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_size:
+            chunks.append("".join(current_items))
         
         return chunks
         
-    def _chunk_pdf(self, text: str) -> List[str]:
+    def _chunk_pdf_from_blocks(self, pdf_blocks: Dict[str, List]) -> List[str]:
         """
-        PDF文本分块
+        直接基于PyMuPDF文本块分块，不再对整段文本重新切分
         
         Args:
-            text: PDF提取的文本
+            pdf_blocks: PDFProcessor提取的文本块（列式结构）
             
         Returns:
             文本块列表
         """
-        # PDF分块逻辑，使用通用文本分块方法
-        return self._chunk_text(text)
+        chunks = []
+        current_parts = []
+        current_size = 0
+        
+        for block_text in pdf_blocks['text']:
+            block_text = block_text.strip()
+            if not block_text:
+                continue
+            block_size = len(block_text)
+            
+            # 超过最大块大小的文本块单独切分
+            if block_size > settings.MAX_CHUNK_SIZE:
+                if current_parts:
+                    chunks.append("\n\n".join(current_parts))
+                    current_parts = []
+                    current_size = 0
+                chunks.extend(self._split_large_paragraph(block_text))
+                continue
+                
+            if current_parts and current_size + block_size > settings.MAX_CHUNK_SIZE:
+                chunks.append("\n\n".join(current_parts))
+                current_parts = []
+                current_size = 0
+                
+            current_parts.append(block_text)
+            current_size += block_size
+            
+        if current_parts:
+            chunks.append("\n\n".join(current_parts))
+            
+        return chunks
         
     def _chunk_text(self, text: str) -> List[str]:
         """
@@ -1459,45 +2339,19 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             文本块列表
         """
-        # 简单按段落分块
+        # 先只根据段落长度计算切分位置，再直接从原文切片得到各块
         chunks = []
-        paragraphs = text.split('\n\n')
-        
-        current_chunk = ""
-        current_size = 0
-        
-        for para in paragraphs:
-            para_size = len(para)
-            
-            # 如果段落本身超过最大块大小，单独作为一个块
-            if para_size > settings.MAX_CHUNK_SIZE:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-                    current_size = 0
-                
+        for start, end, oversized in _paragraph_chunk_bounds(text, settings.MAX_CHUNK_SIZE):
+            if oversized:
                 # 大段落再切分
-                para_chunks = self._split_large_paragraph(para)
-                chunks.extend(para_chunks)
-                continue
-                
-            # 如果加上这个段落会超过最大块大小，则开始新块
-            if current_size + para_size > settings.MAX_CHUNK_SIZE:
-                chunks.append(current_chunk)
-                current_chunk = para
-                current_size = para_size
+                chunks.extend(self._split_large_paragraph(text[start:end]))
             else:
-                if current_chunk:
-                    current_chunk += "\n\n" + para
-                else:
-                    current_chunk = para
-                current_size += para_size
+                chunks.append(text[start:end])
                 
-        # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
-            
         return chunks
+    
+    # PDF文本分块直接使用通用文本分块方法
+    _chunk_pdf = _chunk_text
         
     def _chunk_by_headings(self, text: str, heading_markers: List[str]) -> List[str]:
         """
@@ -1510,37 +2364,35 @@ class ChunkingProcessor(DocumentProcessor):
         Returns:
             文本块列表
         """
+        # 标题前缀合并为一个正则，每行只需匹配一次
+        heading_re = _heading_marker_re(tuple(heading_markers))
+            
         chunks = []
-        lines = text.split('\n')
-        
-        current_chunk = ""
+        current_lines = []
         current_size = 0
         
-        for line in lines:
+        max_size = settings.MAX_CHUNK_SIZE
+        for line in _iter_lines(text):
             # 检查是否为标题行
-            is_heading = any(line.startswith(marker) for marker in heading_markers)
+            is_heading = heading_re is not None and heading_re.match(line) is not None
+            has_content = bool(current_lines) and bool(current_lines[0])
             
-            # 如果是标题行且当前块非空，则开始新块
-            if is_heading and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = line
+            # 遇到标题行，或加入该行后会超过大小限制时，先输出当前块，再以该行开始新块
+            if has_content and (is_heading or current_size + len(line) + 1 > max_size):
+                chunks.append("\n".join(current_lines))
+                current_lines = [line]
                 current_size = len(line)
-            else:
-                if current_chunk:
-                    current_chunk += "\n" + line
-                else:
-                    current_chunk = line
+            elif has_content:
+                current_lines.append(line)
                 current_size += len(line) + 1  # +1 for newline
-                
-            # 如果当前块太大，也开始新块
-            if current_size > settings.MAX_CHUNK_SIZE:
-                chunks.append(current_chunk)
-                current_chunk = ""
-                current_size = 0
+            else:
+                # 块以空行开头时由该行替换
+                current_lines = [line]
+                current_size = len(line)
                 
         # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_lines and current_lines[0]:
+            chunks.append("\n".join(current_lines))
             
         return chunks
         
@@ -1555,9 +2407,9 @@ class ChunkingProcessor(DocumentProcessor):
             分割后的文本块列表
         """
         chunks = []
-        sentences = paragraph.replace('. ', '.\n').split('\n')
+        sentences = _SENT_RE.split(paragraph)
         
-        current_chunk = ""
+        current_sentences = []
         current_size = 0
         
         for sentence in sentences:
@@ -1565,9 +2417,9 @@ class ChunkingProcessor(DocumentProcessor):
             
             # 如果句子本身超过最大块大小，按固定长度分割
             if sentence_size > settings.MAX_CHUNK_SIZE:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
+                if current_sentences and current_sentences[0]:
+                    chunks.append(" ".join(current_sentences))
+                    current_sentences = []
                     current_size = 0
                     
                 # 按固定长度分割大句子
@@ -1578,19 +2430,19 @@ class ChunkingProcessor(DocumentProcessor):
                 
             # 如果加上这个句子会超过最大块大小，则开始新块
             if current_size + sentence_size > settings.MAX_CHUNK_SIZE:
-                chunks.append(current_chunk)
-                current_chunk = sentence
+                chunks.append(" ".join(current_sentences))
+                current_sentences = [sentence]
                 current_size = sentence_size
             else:
-                if current_chunk:
-                    current_chunk += " " + sentence
+                if current_sentences and current_sentences[0]:
+                    current_sentences.append(sentence)
                 else:
-                    current_chunk = sentence
+                    current_sentences = [sentence]
                 current_size += sentence_size + 1  # +1 for space
                 
         # 添加最后一个块
-        if current_chunk:
-            chunks.append(current_chunk)
+        if current_sentences and current_sentences[0]:
+            chunks.append(" ".join(current_sentences))
             
         return chunks
 
@@ -1601,6 +2453,18 @@ class VectorizationProcessor(DocumentProcessor):
     
     SUPPORTED_TYPES = ['pdf', 'md', 'markdown', 'docx', 'txt', 'html']
     
+    def __init__(self, embed_model: Optional[Any] = None):
+        """
+        初始化向量化处理器
+        
+        索引阶段由LlamaIndex计算并写入向量，管道默认只统计节点数；
+        调用方需要在上下文中直接获得向量时传入嵌入模型
+        
+        Args:
+            embed_model: 嵌入模型，为空时不计算向量
+        """
+        self.embed_model = embed_model
+    
     def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理文档向量化"""
         chunks = context.get('chunks', [])
@@ -1609,8 +2473,9 @@ class VectorizationProcessor(DocumentProcessor):
             return context
             
         try:
-            # 这里应该调用向量化服务
-            # 简化示例，实际应连接到向量数据库
+            if self.embed_model is not None:
+                context['embeddings'] = self._embed_chunks(self.embed_model, chunks)
+                
             node_count = len(chunks)
             doc_id = context.get('metadata', {}).get('doc_id')
             
@@ -1624,7 +2489,42 @@ class VectorizationProcessor(DocumentProcessor):
             logger.error(f"向量化失败: {str(e)}")
             raise
             
-        return context 
+        return context
+    
+    def _embed_chunks(self, embed_model: Any, chunks: List[str]) -> np.ndarray:
+        """
+        批量计算文本块的嵌入向量
+        
+        每批文本只发起一次嵌入调用，避免逐块请求
+        
+        Args:
+            embed_model: 嵌入模型
+            chunks: 文本块列表
+            
+        Returns:
+            形状为(块数, 维度)的float32向量矩阵，各行已做L2归一化
+        """
+        batch_size = max(1, settings.EMBED_BATCH_SIZE)
+        
+        # 本地sentence-transformers模型一次encode即可完成全部批次
+        if hasattr(embed_model, 'encode'):
+            vectors = embed_model.encode(
+                chunks,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            return np.asarray(vectors, dtype=np.float32)
+            
+        vectors = []
+        for start in range(0, len(chunks), batch_size):
+            vectors.extend(embed_model.get_text_embedding_batch(chunks[start:start + batch_size]))
+        vectors = np.asarray(vectors, dtype=np.float32)
+        
+        # 与encode的normalize_embeddings=True保持一致，两种模型得到的向量可直接比较
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
 
 
 @PipelineFactory.register_processor
@@ -1645,20 +2545,11 @@ class HTMLProcessor(DocumentProcessor):
             
         file_path = context.get('file_path')
         try:
-            # 读取HTML文件
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-                
-            # 尝试提取纯文本
-            try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-                text_content = soup.get_text(separator='\n')
-            except ImportError:
-                # 如果没有BeautifulSoup，使用简单替换
-                import re
-                text_content = re.sub(r'<[^>]*>', ' ', html_content)
-                text_content = re.sub(r'\s+', ' ', text_content).strip()
+            # 读取HTML文件，大文件通过内存映射读取，不保留完整的bytes副本
+            html_content = _read_text_file(file_path, context.get('file_size'))
+            
+            # 提取纯文本，文件大小不影响所用的解析器
+            text_content = self._extract_text(html_content)
                 
             # 更新上下文
             context['text_content'] = text_content
@@ -1670,6 +2561,49 @@ class HTMLProcessor(DocumentProcessor):
             raise
             
         return context 
+    
+    def _extract_text(self, html_content: str) -> str:
+        """
+        从HTML中提取纯文本，依次尝试selectolax、lxml、BeautifulSoup和正则替换
+        
+        Args:
+            html_content: HTML内容
+            
+        Returns:
+            纯文本内容
+        """
+        # 优先使用基于C实现的selectolax解析器
+        if _SelectolaxHTMLParser is not None:
+            tree = _SelectolaxHTMLParser(html_content)
+            # 与BeautifulSoup.get_text一致，不提取脚本、样式和模板中的文本
+            tree.strip_tags(list(_HTML_NON_TEXT_TAGS))
+            return tree.text(separator='\n')
+        
+        # 其次直接使用lxml构建文档树，省去BeautifulSoup的对象包装
+        if _lxml_html is not None:
+            try:
+                tree = _lxml_html.document_fromstring(html_content)
+                # 与BeautifulSoup.get_text一致，不提取脚本、样式和模板中的文本
+                # 只清空元素内容而不移除元素，其后的文本仍作为独立的文本节点
+                for element in list(tree.iter(*_HTML_NON_TEXT_TAGS)):
+                    element.text = None
+                    del element[:]
+                return '\n'.join(tree.itertext())
+            except (ValueError, _lxml_etree.ParserError):
+                # 空文档或无法解析的内容交给后续方式处理
+                pass
+        
+        # 再次使用BeautifulSoup，优先lxml后端
+        if _BeautifulSoup is not None:
+            try:
+                soup = _BeautifulSoup(html_content, 'lxml')
+            except _FeatureNotFound:
+                soup = _BeautifulSoup(html_content, 'html.parser')
+            return soup.get_text(separator='\n')
+        
+        # 如果都没有安装，使用简单替换
+        text_content = _TAG_RE.sub(' ', html_content)
+        return _WS_RE.sub(' ', text_content).strip()
 
 
 @PipelineFactory.register_processor
@@ -1687,12 +2621,12 @@ class ParallelProcessor(DocumentProcessor):
         super().__init__()
         self.processor_class = processor_class
         self.max_workers = max_workers
-        self.processor_instances = []
         
-        # 初始化处理器实例池
-        for _ in range(max_workers):
-            processor = processor_class()
-            self.processor_instances.append(processor)
+        # 处理器的process方法不修改实例状态，所有工作线程共享同一个实例
+        self.processor = processor_class()
+            
+        # 线程池随处理器创建一次，在多次批处理之间复用
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
     
     def process(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -1709,59 +2643,25 @@ class ParallelProcessor(DocumentProcessor):
             
         # 如果只有一个上下文，直接处理
         if len(contexts) == 1:
-            processor = self.processor_instances[0]
-            return [processor.process(contexts[0])]
+            return [self.processor.process(contexts[0])]
             
-        # 并行处理多个上下文
+        # 并行处理多个上下文，结果保持输入顺序
         try:
-            # 使用asyncio进行并行处理
-            import asyncio
-            return asyncio.run(self._process_parallel(contexts))
+            return list(self._executor.map(self.processor.process, contexts))
         except Exception as e:
             logger.error(f"并行处理失败: {str(e)}")
             # 回退到串行处理
-            results = []
-            for context in contexts:
-                processor = self.processor_instances[0]
-                results.append(processor.process(context))
-            return results
+            return [self.processor.process(context) for context in contexts]
     
-    async def _process_parallel(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        使用异步方式并行处理多个上下文
-        
-        Args:
-            contexts: 文档上下文列表
-            
-        Returns:
-            处理后的上下文列表
-        """
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-        
-        # 创建线程池
-        executor = ThreadPoolExecutor(max_workers=self.max_workers)
-        loop = asyncio.get_event_loop()
-        
-        # 创建任务
-        tasks = []
-        for i, context in enumerate(contexts):
-            # 选择处理器实例
-            processor_index = i % len(self.processor_instances)
-            processor = self.processor_instances[processor_index]
-            
-            # 创建异步任务
-            task = loop.run_in_executor(
-                executor,
-                processor.process,
-                context
-            )
-            tasks.append(task)
-        
-        # 等待所有任务完成
-        results = await asyncio.gather(*tasks)
-        
-        return results
+    def close(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False)
+    
+    def __del__(self):
+        """处理器被回收时释放线程池"""
+        executor = getattr(self, '_executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False)
 
 
 class AsyncDocumentPipeline:
@@ -1777,6 +2677,13 @@ class AsyncDocumentPipeline:
         """
         self.processors = processors or []
         self.max_workers = max_workers
+        
+        # 并行包装只创建一次，多次调用process_documents时复用其处理器实例和线程池
+        self._parallel_processors = [
+            processor if isinstance(processor, ParallelProcessor)
+            else ParallelProcessor(processor.__class__, max_workers=max_workers)
+            for processor in self.processors
+        ]
     
     async def process_documents(self, files: List[str]) -> List[Dict[str, Any]]:
         """
@@ -1791,53 +2698,38 @@ class AsyncDocumentPipeline:
         if not files:
             return []
             
-        # 为每个文件创建初始上下文
-        contexts = []
-        for file_path in files:
-            # 提取文件类型
-            file_type = self._get_file_type(file_path)
-            context = {
+        # 为每个文件创建初始上下文，同一批次的文件使用相同的创建时间
+        created_at = datetime.datetime.now().isoformat()
+        contexts = [
+            {
                 'file_path': file_path,
-                'file_type': file_type,
+                'file_type': self._get_file_type(file_path),
                 'metadata': {
                     'doc_id': self._generate_doc_id(file_path),
                     'filename': os.path.basename(file_path),
-                    'created_at': datetime.datetime.now().isoformat()
+                    'created_at': created_at
                 }
             }
-            contexts.append(context)
-        
-        # 逐步应用每个处理器
-        for processor in self.processors:
-            # 检查是否支持批处理
-            if isinstance(processor, ParallelProcessor):
-                # 并行处理
-                contexts = processor.process(contexts)
-            else:
-                # 创建处理器的并行包装
-                parallel_processor = ParallelProcessor(
-                    processor.__class__, 
-                    max_workers=self.max_workers
-                )
-                contexts = parallel_processor.process(contexts)
+            for file_path in files
+        ]
+        
+        # 逐步应用每个处理器，批处理在线程中等待完成，不阻塞事件循环
+        for parallel_processor in self._parallel_processors:
+            contexts = await asyncio.to_thread(parallel_processor.process, contexts)
         
         return contexts
     
     def _get_file_type(self, file_path: str) -> str:
         """从文件路径获取文件类型"""
-        _, ext = os.path.splitext(file_path)
-        return ext.lstrip('.').lower()
+        # 与os.path.splitext语义一致：忽略文件名开头的点，取最后一个点之后的部分
+        _, dot, ext = os.path.basename(file_path).lstrip('.').rpartition('.')
+        return ext.lower() if dot else ''
     
     def _generate_doc_id(self, file_path: str) -> str:
         """为文件生成唯一ID"""
-        import hashlib
-        import time
-        
-        # 使用文件路径和时间戳生成唯一ID
-        unique_str = f"{file_path}_{time.time()}"
-        doc_id = hashlib.md5(unique_str.encode()).hexdigest()
-        
-        return doc_id
+        # 使用文件路径和纳秒时间戳生成唯一ID，BLAKE2b的128位摘要与原MD5 ID长度一致
+        unique_str = f"{file_path}_{time.time_ns()}"
+        return hashlib.blake2b(unique_str.encode(), digest_size=16).hexdigest()
 
 
 # 扩展ChunkingProcessor以支持增量更新
@@ -1893,39 +2785,42 @@ class IncrementalChunkingProcessor(ChunkingProcessor):
         Returns:
             更新后的分块列表
         """
-        import difflib
+        # 内容完全相同时无需计算差异
+        if new_content == old_content:
+            logger.info("未检测到文档变更，跳过处理")
+            return []
         
-        # 计算差异
-        diff = list(difflib.ndiff(old_content.splitlines(), new_content.splitlines()))
+        # 计算差异，只遍历编辑操作区间，不逐行生成ndiff文本
+        old_lines = old_content.splitlines()
+        new_lines = new_content.splitlines()
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
         
-        # 提取变更的段落
+        # 提取变更的段落。操作区间按顺序覆盖新内容的全部行，因此每个段落都是
+        # new_lines中的连续区间，只记录起止行号，分块前再拼接文本
         changes = []
-        current_section = []
+        section_start = section_end = 0
         in_change = False
         
-        for line in diff:
-            if line.startswith('- '):
-                # 删除行，标记为变更
-                in_change = True
-            elif line.startswith('+ '):
-                # 添加行，标记为变更并保存内容
-                in_change = True
-                current_section.append(line[2:])
-            elif line.startswith('  '):
-                # 未变更行
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                # 未变更行，只在变更之后补充上下文，直到当前段落达到5行
                 if in_change:
-                    # 如果之前有变更，添加上下文
-                    current_section.append(line[2:])
+                    section_end = min(j2, max(section_end + 1, section_start + 5))
                     
                     # 如果上下文足够长，保存当前变更段落
-                    if len(current_section) >= 5:
-                        changes.append('\n'.join(current_section))
-                        current_section = []
+                    if section_end - section_start >= 5:
+                        changes.append((section_start, section_end))
                         in_change = False
+            else:
+                # 删除、替换或插入，标记为变更并保存新增内容
+                if not in_change:
+                    section_start = j1
+                    in_change = True
+                section_end = j2
         
         # 处理最后一个变更段落
-        if current_section:
-            changes.append('\n'.join(current_section))
+        if in_change and section_end > section_start:
+            changes.append((section_start, section_end))
         
         # 如果没有检测到变更，返回空列表
         if not changes:
@@ -1934,7 +2829,8 @@ class IncrementalChunkingProcessor(ChunkingProcessor):
         
         # 处理变更的段落
         chunks = []
-        for section in changes:
+        for start, end in changes:
+            section = '\n'.join(new_lines[start:end])
             # 根据文件类型选择合适的分块策略
             if file_type in ['md', 'markdown']:
                 section_chunks = self._chunk_markdown(section)
@@ -1954,19 +2850,33 @@ class ContextCompressorProcessor(DocumentProcessor):
     上下文压缩处理器 - 基于LangChain的设计思想
     
     根据查询内容动态压缩文档块，提高检索效率
+    
+    嵌入模型的编码结果在缓存前统一做L2归一化，之后的余弦相似度即为点积
     """
     
-    def __init__(self, embedding_model=None, compression_ratio=0.7):
+    # 按内容哈希缓存的嵌入向量条目上限，超出后淘汰最久未使用的条目（1536维时约60MB）
+    EMBEDDING_CACHE_MAX_ENTRIES = 10_000
+    
+    def __init__(self, embedding_model=None, compression_ratio=0.7, quantization: str = 'none'):
         """
         初始化上下文压缩处理器
         
         Args:
             embedding_model: 用于计算相关性的嵌入模型，如果为None则使用简单的关键词匹配
             compression_ratio: 压缩比例，默认压缩到原始大小的70%
+            quantization: 相关性计算使用的向量精度，none/int8/fp16，低精度仅在安装SimSIMD时生效
         """
         super().__init__()
         self.embedding_model = embedding_model
         self.compression_ratio = compression_ratio
+        self.quantization = quantization
+        # 最近一次编码的文本块、归一化嵌入矩阵(N, d)及其FAISS索引，同一组块再次查询时直接复用
+        # 三者作为一个元组整体替换，多线程共享处理器时不会读到不一致的组合
+        self._chunk_embedding_cache: Optional[Tuple[Tuple[str, ...], np.ndarray, Any]] = None
+        # 文本内容哈希到嵌入向量的LRU缓存，跨文档和查询复用重复文本的编码结果
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._embedding_cache_lock = threading.Lock()
+        self.embedding_cache_stats = {'hits': 0, 'misses': 0}
     
     def process(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -2014,17 +2924,24 @@ class ContextCompressorProcessor(DocumentProcessor):
         """
         compressed_chunks = []
         
-        for chunk in chunks:
-            # 计算块与查询的相关性分数
-            relevance_score = self._calculate_relevance(chunk, query)
-            
+        # 查询词在整个压缩过程中不变，只提取一次
+        query_terms = self._query_terms(query)
+        
+        # 一次性计算所有块与查询的相关性分数
+        relevance_scores = self._calculate_relevances(chunks, query, query_terms)
+        
+        # 所有块都高度相关时无需压缩
+        if min(relevance_scores) > 0.8:
+            return list(chunks)
+        
+        for chunk, relevance_score in zip(chunks, relevance_scores):
             # 根据相关性分数决定压缩程度
             if relevance_score > 0.8:
                 # 高相关，保留完整块
                 compressed_chunks.append(chunk)
             elif relevance_score > 0.5:
                 # 中等相关，提取核心段落
-                core = self._extract_core_sentences(chunk, query)
+                core = self._extract_core_sentences(chunk, query, query_terms)
                 compressed_chunks.append(core)
             else:
                 # 低相关，只保留摘要
@@ -2034,58 +2951,222 @@ class ContextCompressorProcessor(DocumentProcessor):
         
         return compressed_chunks
     
-    def _calculate_relevance(self, text: str, query: str) -> float:
+    def _calculate_relevances(
+        self, chunks: List[str], query: str, query_terms: Optional[List[str]] = None
+    ) -> List[float]:
         """
-        计算文本与查询的相关性分数
+        批量计算文本块与查询的相关性分数
+        
+        有嵌入模型时在一次编码调用中同时编码文本块和查询，并以矩阵运算计算余弦相似度
         
         Args:
-            text: 文本内容
+            chunks: 文本块列表
             query: 查询内容
+            query_terms: 预先提取的查询词，未提供时从查询中提取
             
         Returns:
-            相关性分数，范围[0,1]
+            与文本块一一对应的相关性分数列表
         """
-        # 如果有嵌入模型，使用语义相似度
         if self.embedding_model:
             try:
-                text_embedding = self.embedding_model.encode(text)
-                query_embedding = self.embedding_model.encode(query)
+                chunk_embeddings, index, query_embedding = self._embed_chunks_and_query(chunks, query)
                 
-                # 计算余弦相似度
-                similarity = self._cosine_similarity(text_embedding, query_embedding)
-                return float(similarity)
+                if index is not None:
+                    similarities = self._index_similarity(index, query_embedding)
+                else:
+                    similarities = self._cosine_similarity(chunk_embeddings, query_embedding)
+                return [float(similarity) for similarity in similarities]
             except Exception as e:
                 logger.warning(f"使用嵌入模型计算相关性失败: {str(e)}，回退到关键词匹配")
         
         # 回退到简单的关键词匹配
-        return self._keyword_relevance(text, query)
+        if query_terms is None:
+            query_terms = self._query_terms(query)
+        return [self._keyword_relevance(chunk, query, query_terms) for chunk in chunks]
+    
+    def _embed_chunks_and_query(self, chunks: List[str], query: str) -> Tuple[np.ndarray, Any, np.ndarray]:
+        """
+        编码文本块和查询，文本块得到连续的float32归一化嵌入矩阵
+        
+        文本块与上次相同时复用其嵌入矩阵和索引，只编码查询；否则文本块与查询在同一批次中编码
+        
+        Args:
+            chunks: 文本块列表
+            query: 查询内容
+            
+        Returns:
+            形状为(N, d)的嵌入矩阵（按配置可为低精度）、文本块较多时的FAISS索引（否则为None）和查询向量
+        """
+        key = tuple(chunks)
+        cached = self._chunk_embedding_cache
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2], self._encode_cached([query])[0]
+        
+        embeddings = self._encode_cached([*chunks, query])
+        matrix = embeddings[:-1]
+        if self.quantization in ('int8', 'fp16') and _simsimd is not None:
+            # 低精度矩阵由SimSIMD直接计算点积，不再构建float32索引
+            matrix = self._quantize_unit_vectors(matrix, self.quantization)
+            index = None
+        else:
+            index = self._build_flat_index(matrix)
+        self._chunk_embedding_cache = (key, matrix, index)
+        return matrix, index, embeddings[-1]
+    
+    @staticmethod
+    def _quantize_unit_vectors(vectors: np.ndarray, mode: str) -> np.ndarray:
+        """
+        降低归一化向量的精度
+        
+        归一化向量各分量在[-1, 1]内，int8量化统一乘以127，无需逐向量缩放系数
+        
+        Args:
+            vectors: 归一化的float32向量
+            mode: 量化方式，int8/fp16
+            
+        Returns:
+            int8或float16向量
+        """
+        if mode == 'int8':
+            return np.round(vectors * 127).astype(np.int8)
+        return vectors.astype(np.float16)
+    
+    @staticmethod
+    def _build_flat_index(matrix: np.ndarray) -> Any:
+        """
+        为归一化嵌入矩阵构建FAISS精确内积索引
+        
+        Args:
+            matrix: 形状为(N, d)的归一化嵌入矩阵
+            
+        Returns:
+            FAISS索引，未安装FAISS或文本块数量不足时返回None
+        """
+        if _faiss is None or matrix.shape[0] <= _FAISS_MIN_CHUNKS:
+            return None
+        index = _faiss.IndexFlatIP(matrix.shape[1])
+        index.add(matrix)
+        return index
+    
+    @staticmethod
+    def _index_similarity(index: Any, query_vector: np.ndarray) -> np.ndarray:
+        """
+        通过FAISS索引计算全部文本块与查询的内积（归一化后即余弦相似度）
+        
+        Args:
+            index: 文本块的FAISS内积索引
+            query_vector: 归一化查询向量
+            
+        Returns:
+            按文本块原始顺序排列的相似度数组
+        """
+        scores, ids = index.search(np.ascontiguousarray(query_vector.reshape(1, -1), dtype=np.float32), index.ntotal)
+        similarities = np.empty(index.ntotal, dtype=np.float32)
+        similarities[ids[0]] = scores[0]
+        return similarities
+    
+    def _encode_cached(self, texts: List[str]) -> np.ndarray:
+        """
+        编码文本为L2归一化的float32嵌入矩阵，按内容哈希复用已编码的向量，未命中的文本一次批量编码
+        
+        Args:
+            texts: 文本列表
+            
+        Returns:
+            形状为(N, d)的连续嵌入矩阵，零向量保持为零
+        """
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).hexdigest() for text in texts]
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        with self._embedding_cache_lock:
+            for i, key in enumerate(keys):
+                vector = self._embedding_cache.get(key)
+                if vector is not None:
+                    self._embedding_cache.move_to_end(key)
+                    vectors[i] = vector
+            missing = [i for i, vector in enumerate(vectors) if vector is None]
+            self.embedding_cache_stats['hits'] += len(texts) - len(missing)
+            self.embedding_cache_stats['misses'] += len(missing)
+        
+        if missing:
+            encoded = np.atleast_2d(np.asarray(
+                self.embedding_model.encode([texts[i] for i in missing]), dtype=np.float32
+            ))
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            encoded = np.divide(encoded, norms, out=np.zeros_like(encoded), where=norms != 0)
+            with self._embedding_cache_lock:
+                for i, vector in zip(missing, encoded):
+                    vectors[i] = vector
+                    self._embedding_cache[keys[i]] = vector
+                    self._embedding_cache.move_to_end(keys[i])
+                while len(self._embedding_cache) > self.EMBEDDING_CACHE_MAX_ENTRIES:
+                    self._embedding_cache.popitem(last=False)
+        
+        return np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+    
+    def _calculate_relevance(self, text: str, query: str) -> float:
+        """
+        计算文本与查询的相关性分数
+        
+        Args:
+            text: 文本内容
+            query: 查询内容
+            
+        Returns:
+            相关性分数，范围[0,1]
+        """
+        return self._calculate_relevances([text], query)[0]
     
-    def _cosine_similarity(self, vec1, vec2):
-        """计算余弦相似度"""
-        import numpy as np
-        dot_product = np.dot(vec1, vec2)
-        norm_a = np.linalg.norm(vec1)
-        norm_b = np.linalg.norm(vec2)
+    def _cosine_similarity(self, vectors, query_vector):
+        """
+        计算一组L2归一化向量与归一化查询向量的余弦相似度，即两者的点积
         
-        if norm_a == 0 or norm_b == 0:
-            return 0
+        向量矩阵为int8或float16时，查询向量按相同精度量化后由SimSIMD计算
+        
+        Args:
+            vectors: 形状为(N, d)的归一化向量矩阵，也可以是单个向量
+            query_vector: 归一化查询向量
             
-        return dot_product / (norm_a * norm_b)
+        Returns:
+            长度为N的相似度数组，零向量的相似度为0
+        """
+        vectors = np.atleast_2d(np.asarray(vectors))
+        query_vector = np.atleast_2d(np.asarray(query_vector, dtype=np.float32))
+        
+        if vectors.dtype == np.int8:
+            query_vector = self._quantize_unit_vectors(query_vector, 'int8')
+            dots = np.asarray(_simsimd.cdist(query_vector, vectors, metric="dot"), dtype=np.float32)
+            return dots.reshape(-1) / (127 * 127)
+        if vectors.dtype == np.float16:
+            query_vector = self._quantize_unit_vectors(query_vector, 'fp16')
+            return np.asarray(_simsimd.cdist(query_vector, vectors, metric="dot"), dtype=np.float32).reshape(-1)
+        
+        vectors = vectors.astype(np.float32, copy=False)
+        if _simsimd is not None:
+            return np.asarray(_simsimd.cdist(query_vector, vectors, metric="dot"), dtype=np.float32).reshape(-1)
+        return vectors @ query_vector[0]
+    
+    @staticmethod
+    def _query_terms(query: str) -> List[str]:
+        """提取查询中用于关键词匹配的词（长度大于2）"""
+        return [t for t in query.lower().split() if len(t) > 2]
     
-    def _keyword_relevance(self, text: str, query: str) -> float:
+    def _keyword_relevance(self, text: str, query: str, query_terms: Optional[List[str]] = None) -> float:
         """
         基于关键词匹配计算相关性
         
         Args:
             text: 文本内容
             query: 查询内容
+            query_terms: 预先提取的查询词，逐句计算时避免重复切分查询
             
         Returns:
             相关性分数
         """
         # 简化版的关键词匹配
         text_lower = text.lower()
-        query_terms = [t for t in query.lower().split() if len(t) > 2]
+        if query_terms is None:
+            query_terms = self._query_terms(query)
         
         if not query_terms:
             return 0.5  # 默认中等相关
@@ -2096,38 +3177,36 @@ class ContextCompressorProcessor(DocumentProcessor):
         
         return min(1.0, relevance)  # 确保不超过1.0
     
-    def _extract_core_sentences(self, text: str, query: str) -> str:
+    def _extract_core_sentences(self, text: str, query: str, query_terms: Optional[List[str]] = None) -> str:
         """
         提取与查询相关的核心句子
         
         Args:
             text: 文本内容
             query: 查询内容
+            query_terms: 预先提取的查询词，未提供时从查询中提取
             
         Returns:
             核心句子组成的文本
         """
-        import re
-        
         # 分割成句子
-        sentences = re.split(r'(?<=[.!?。！？])\s+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         
         # 如果句子太少，直接返回原文
         if len(sentences) <= 3:
             return text
         
         # 计算每个句子的相关性得分
-        sentence_scores = []
-        for sentence in sentences:
-            score = self._keyword_relevance(sentence, query)
-            sentence_scores.append((sentence, score))
-        
-        # 排序并选择得分最高的前N个句子
-        sentence_scores.sort(key=lambda x: x[1], reverse=True)
+        if query_terms is None:
+            query_terms = self._query_terms(query)
+        scores = [self._keyword_relevance(sentence, query, query_terms) for sentence in sentences]
         
         # 确定要保留的句子数，压缩到指定比例
         keep_count = max(1, int(len(sentences) * self.compression_ratio))
-        top_sentences = [s[0] for s in sentence_scores[:keep_count]]
+        
+        # 选择得分最高的前N个句子，同分时保留靠前的句子（与稳定排序后截取一致）
+        top_indices = heapq.nlargest(keep_count, range(len(sentences)), key=scores.__getitem__)
+        top_sentences = {sentences[i] for i in top_indices}
         
         # 恢复原始顺序
         ordered_sentences = [s for s in sentences if s in top_sentences]
@@ -2144,9 +3223,8 @@ class ContextCompressorProcessor(DocumentProcessor):
         Returns:
             文本摘要
         """
-        # 简单摘要：取前几个句子
-        import re
-        sentences = re.split(r'(?<=[.!?。！？])\s+', text)
+        # 简单摘要：取前几个句子，最多切分3次，不扫描其余文本
+        sentences = _SENTENCE_SPLIT_RE.split(text, maxsplit=3)
         
         # 取前2-3个句子作为摘要
         summary_length = min(3, len(sentences))
@@ -2236,16 +3314,16 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         metadata['file_type'] = context.get('file_type', '')
         metadata['file_size'] = context.get('file_size', 0)
         
-        # 获取文档创建和修改时间
+        # 获取文档创建和修改时间，一次stat同时取得两个时间，文件不可访问时跳过
         file_path = context.get('file_path', '')
-        if file_path and os.path.exists(file_path):
-            import datetime
-            metadata['created_time'] = datetime.datetime.fromtimestamp(
-                os.path.getctime(file_path)
-            ).isoformat()
-            metadata['modified_time'] = datetime.datetime.fromtimestamp(
-                os.path.getmtime(file_path)
-            ).isoformat()
+        if file_path:
+            try:
+                stat = os.stat(file_path)
+            except (OSError, ValueError):
+                pass
+            else:
+                metadata['created_time'] = datetime.datetime.fromtimestamp(stat.st_ctime).isoformat()
+                metadata['modified_time'] = datetime.datetime.fromtimestamp(stat.st_mtime).isoformat()
         
         # 文档结构信息
         if 'document_structure' in context:
@@ -2305,18 +3383,15 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         }
         
         # 提取关键词
-        try:
-            import jieba.analyse
-            keywords = jieba.analyse.extract_tags(content, topK=10)
-            metadata['keywords'] = keywords
-        except ImportError:
+        jieba_analyse = _get_jieba_analyse()
+        if jieba_analyse is not None:
+            metadata['keywords'] = jieba_analyse.extract_tags(content, topK=10)
+        else:
             # 如果没有jieba，使用简单的词频统计
             metadata['keywords'] = self._extract_keywords_by_frequency(content)
         
         # 提取时间引用
-        import re
-        time_pattern = re.compile(r'\d{4}年|\d{4}-\d{2}|\d{4}/\d{2}|\d{4}\.\d{2}')
-        time_refs = time_pattern.findall(content)
+        time_refs = _TIME_REF_RE.findall(content)
         if time_refs:
             metadata['time_references'] = time_refs
         
@@ -2343,18 +3418,12 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         Returns:
             关键词列表
         """
-        import re
-        from collections import Counter
+        # 简单分词（中英文混合）并计算词频
+        word_freq = Counter(_WORD_RE.findall(text.lower()))
         
-        # 简单分词（中英文混合）
-        words = re.findall(r'[\w\u4e00-\u9fff]+', text.lower())
-        
-        # 过滤停用词（简化版）
-        stopwords = {'的', '了', '和', '是', '在', '有', '与', '这', '那', '之', '或', '及', 'a', 'an', 'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'with'}
-        words = [w for w in words if w not in stopwords and len(w) > 1]
-        
-        # 计算词频
-        word_freq = Counter(words)
+        # 过滤停用词和单字词，按不同的词而不是逐次出现判断
+        for word in [w for w in word_freq if len(w) <= 1 or w in _KEYWORD_STOPWORDS]:
+            del word_freq[word]
         
         # 返回top_k关键词
         return [w for w, _ in word_freq.most_common(top_k)]
@@ -2373,11 +3442,7 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         
         # 实现简单的规则匹配
         # 例如：识别大写开头的词作为潜在实体（英文）
-        import re
-        
-        # 英文实体识别
-        eng_entity_pattern = re.compile(r'\b[A-Z][a-zA-Z]*(?:\s+[A-Z][a-zA-Z]*)*\b')
-        eng_entities = eng_entity_pattern.findall(text)
+        eng_entities = _EN_ENTITY_RE.findall(text)
         
         # 过滤单个词且太常见的词
         common_words = {'I', 'You', 'He', 'She', 'It', 'We', 'They', 'The', 'A', 'An'}
@@ -2385,13 +3450,14 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         
         entities.extend(eng_entities)
         
-        # 中文人名识别（简易版）
-        cn_name_pattern = re.compile(r'[\u4e00-\u9fff]{2,3}(?:先生|女士|老师|教授|博士)')
-        cn_names = cn_name_pattern.findall(text)
+        # 中文人名识别（简易版），人名必须带称谓后缀
+        cn_names = []
+        if any(suffix in text for suffix in _CN_TITLE_SUFFIXES):
+            cn_names = _CN_NAME_RE.findall(text)
         
         if cn_names:
             # 去掉称谓后缀
-            cn_names = [re.sub(r'(先生|女士|老师|教授|博士)$', '', name) for name in cn_names]
+            cn_names = [_CN_TITLE_SUFFIX_RE.sub('', name) for name in cn_names]
             entities.extend(cn_names)
         
         return list(set(entities))  # 去重
@@ -2407,34 +3473,8 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         Returns:
             主题领域列表
         """
-        # 根据关键词判断主题领域
-        topics = set()
-        
-        # 技术主题
-        tech_terms = {'python', 'java', 'javascript', 'html', 'css', 'coding', 'algorithm', 'programming', 
-                       '编程', '算法', '代码', '开发', '软件', '数据库', '测试', '部署', '服务器'}
-        if any(kw.lower() in tech_terms for kw in keywords):
-            topics.add('技术')
-        
-        # 商业主题
-        business_terms = {'market', 'business', 'company', 'strategy', 'investment', 'customer', 'product',
-                          '市场', '商业', '公司', '策略', '投资', '客户', '产品', '营销', '销售'}
-        if any(kw.lower() in business_terms for kw in keywords):
-            topics.add('商业')
-        
-        # 教育主题
-        education_terms = {'education', 'teaching', 'learning', 'student', 'school', 'university', 'course',
-                           '教育', '教学', '学习', '学生', '学校', '大学', '课程', '培训'}
-        if any(kw.lower() in education_terms for kw in keywords):
-            topics.add('教育')
-        
-        # 医疗主题
-        medical_terms = {'medical', 'healthcare', 'disease', 'patient', 'treatment', 'medicine', 'doctor',
-                         '医疗', '健康', '疾病', '患者', '治疗', '药物', '医生', '医院'}
-        if any(kw.lower() in medical_terms for kw in keywords):
-            topics.add('医疗')
-        
-        # 扩展更多领域...
+        # 根据关键词判断主题领域，每个关键词只查一次词表
+        topics = {_TOPIC_BY_TERM[kw] for kw in map(str.lower, keywords) if kw in _TOPIC_BY_TERM}
         
         return list(topics)
     
@@ -2450,10 +3490,8 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
         """
         references = []
         
-        # 提取URL
-        import re
-        url_pattern = re.compile(r'https?://\S+')
-        urls = url_pattern.findall(text)
+        # 提取URL，URL必须以http开头
+        urls = _URL_RE.findall(text) if 'http' in text else []
         
         for url in urls:
             references.append({
@@ -2461,9 +3499,8 @@ class MetadataAwareChunkingProcessor(ChunkingProcessor):
                 'value': url
             })
         
-        # 提取文献引用 [1], [2] 等
-        citation_pattern = re.compile(r'\[(\d+)\]')
-        citations = citation_pattern.findall(text)
+        # 提取文献引用 [1], [2] 等，文本中没有方括号时无需扫描
+        citations = _CITATION_RE.findall(text) if '[' in text else []
         
         for citation in citations:
             references.append({
@@ -7,13 +7,19 @@ from pathlib import Path
 import asyncio
 from datetime import datetime
 
+import aiofiles
+
 from enterprise_kb.core.config.settings import settings
 from enterprise_kb.core.document_pipeline.base import PipelineFactory
-from enterprise_kb.db.repositories.document_repository import DocumentRepository
+from enterprise_kb.core.metadata_writer import get_metadata_writer
 from enterprise_kb.schemas.documents import DocumentStatus
+from enterprise_kb.utils.file_type import detect_file_type
 
 logger = logging.getLogger(__name__)
 
+# 异步写入大文件时每次写入的字节数，分段写入使事件循环能及时处理其他请求
+_WRITE_CHUNK_BYTES = 1024 * 1024
+
 class DocumentProcessor:
     """文档处理器，处理上传的文档并索引"""
 
@@ -22,9 +28,9 @@ class DocumentProcessor:
         self.upload_dir = settings.UPLOAD_DIR
         os.makedirs(self.upload_dir, exist_ok=True)
 
-    def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
+    async def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
         """
-        保存上传的文件
+        保存上传的文件，写入在线程池中完成，不阻塞事件循环
 
         Args:
             file_content: 文件内容
@@ -38,12 +44,14 @@ class DocumentProcessor:
         safe_filename = f"{file_id}{file_ext}"
         file_path = os.path.join(self.upload_dir, safe_filename)
 
-        with open(file_path, "wb") as f:
-            f.write(file_content)
+        async with aiofiles.open(file_path, "wb") as f:
+            view = memoryview(file_content)
+            for start in range(0, len(view), _WRITE_CHUNK_BYTES):
+                await f.write(view[start:start + _WRITE_CHUNK_BYTES])
 
         return file_path
 
-    def process_document(
+    async def process_document(
         self,
         file_path: str,
         metadata: Dict[str, Any],
@@ -69,8 +77,8 @@ class DocumentProcessor:
             处理结果
         """
         try:
-            # 获取文件类型
-            file_type = os.path.splitext(file_path)[1].lower().lstrip(".")
+            # 获取文件类型，扩展名与内容不符时以内容为准
+            file_type = detect_file_type(file_path)
 
             # 创建处理上下文
             context = {
@@ -85,13 +93,15 @@ class DocumentProcessor:
             pipeline = PipelineFactory.create_pipeline(
                 file_type,
                 custom_processors,
-                use_markitdown=use_markitdown
+                use_markitdown=use_markitdown,
+                use_cache=settings.PIPELINE_CACHE_ENABLED
             )
-            result_context = pipeline.process(context)
+            # 各处理器在线程中执行，不阻塞事件循环
+            result_context = await pipeline.process_async(context)
 
             # 如果生成了Markdown内容并且需要保存，将其保存到文件
             if convert_to_markdown and "markdown_content" in result_context:
-                md_file_path = self._save_markdown_content(file_path, result_context["markdown_content"])
+                md_file_path = await self._save_markdown_content(file_path, result_context["markdown_content"])
                 result_context["markdown_file_path"] = md_file_path
 
             # 处理结果
@@ -108,8 +118,8 @@ class DocumentProcessor:
 
             # 如果需要存储元数据到MySQL
             if store_metadata:
-                # 异步存储元数据
-                self._store_metadata_to_db(
+                # 放入后台写入队列
+                await self._store_metadata_to_db(
                     doc_id=metadata.get("doc_id"),
                     file_path=file_path,
                     file_type=file_type,
@@ -123,7 +133,7 @@ class DocumentProcessor:
             logger.error(f"文档处理失败: {str(e)}")
             raise
 
-    def _save_markdown_content(self, original_file_path: str, markdown_content: str) -> str:
+    async def _save_markdown_content(self, original_file_path: str, markdown_content: str) -> str:
         """
         保存Markdown内容到文件
 
@@ -140,12 +150,12 @@ class DocumentProcessor:
         md_file_path = os.path.join(self.upload_dir, md_filename)
 
         # 保存Markdown内容
-        with open(md_file_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        async with aiofiles.open(md_file_path, "w", encoding="utf-8") as f:
+            await f.write(markdown_content)
 
         return md_file_path
 
-    def _store_metadata_to_db(
+    async def _store_metadata_to_db(
         self,
         doc_id: str,
         file_path: str,
@@ -186,40 +196,14 @@ class DocumentProcessor:
                 "updated_at": datetime.now()
             }
 
-            # 创建异步任务存储元数据
-            asyncio.create_task(self._async_store_metadata(document_data))
+            # 放入队列，由后台任务批量写入数据库，队列已满时等待
+            await get_metadata_writer().put(document_data)
 
-            logger.info(f"已创建异步任务存储文档元数据: {doc_id}")
+            logger.info(f"已加入元数据写入队列: {doc_id}")
 
         except Exception as e:
             logger.error(f"准备存储元数据失败: {str(e)}")
 
-    async def _async_store_metadata(self, document_data: Dict[str, Any]) -> None:
-        """
-        异步存储元数据到数据库
-
-        Args:
-            document_data: 文档数据
-        """
-        try:
-            # 创建文档仓库
-            doc_repo = DocumentRepository()
-
-            # 检查文档是否已存在
-            existing_doc = await doc_repo.get(document_data["id"])
-
-            if existing_doc:
-                # 更新现有文档
-                await doc_repo.update(document_data["id"], document_data)
-                logger.info(f"更新文档元数据成功: {document_data['id']}")
-            else:
-                # 创建新文档
-                await doc_repo.create(document_data)
-                logger.info(f"创建文档元数据成功: {document_data['id']}")
-
-        except Exception as e:
-            logger.error(f"存储元数据到数据库失败: {str(e)}")
-
     def delete_document(self, doc_id: str) -> bool:
         """
         删除文档
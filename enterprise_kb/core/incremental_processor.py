@@ -1,5 +1,6 @@
 """增量文档处理模块，避免重新处理整个文档"""
 import os
+import asyncio
 import logging
 import hashlib
 import json
@@ -121,11 +122,9 @@ class IncrementalProcessor:
         Returns:
             文件哈希
         """
-        hasher = hashlib.md5()
+        # 哈希值保存在状态文件中用于变更检测，沿用MD5以保持与已有状态兼容
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+            return hashlib.file_digest(f, "md5").hexdigest()
     
     def _compute_text_hash(self, text: str) -> str:
         """计算文本哈希
@@ -138,6 +137,48 @@ class IncrementalProcessor:
         """
         return hashlib.md5(text.encode("utf-8")).hexdigest()
     
+    async def _batched_add_nodes(self, nodes: List[BaseNode], datasource_name: str) -> List[str]:
+        """分批并发地将节点写入向量存储，限制单次写入大小和同时写入的批次数
+        
+        任一批次写入失败时，删除其他批次已写入的节点后重新抛出异常，不留下部分写入的文档
+        
+        Args:
+            nodes: 节点列表
+            datasource_name: 数据源名称
+            
+        Returns:
+            与节点顺序一致的节点ID列表
+        """
+        batch_size = max(1, settings.VECTOR_INSERT_BATCH_SIZE)
+        if len(nodes) <= batch_size:
+            return await self.vector_store_manager.add_nodes(nodes, datasource_name)
+        
+        semaphore = asyncio.Semaphore(max(1, settings.VECTOR_INSERT_CONCURRENCY))
+        
+        async def add_batch(batch: List[BaseNode]) -> List[str]:
+            async with semaphore:
+                return await self.vector_store_manager.add_nodes(batch, datasource_name)
+        
+        results = await asyncio.gather(*(
+            add_batch(nodes[start:start + batch_size])
+            for start in range(0, len(nodes), batch_size)
+        ), return_exceptions=True)
+        
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            inserted_ids = [
+                node_id
+                for result in results if not isinstance(result, BaseException)
+                for node_id in result
+            ]
+            try:
+                await self.vector_store_manager.delete_node_ids(inserted_ids, datasource_name)
+            except Exception as e:
+                logger.error(f"回滚已写入的 {len(inserted_ids)} 个节点失败: {str(e)}")
+            raise errors[0]
+        
+        return [node_id for batch_ids in results for node_id in batch_ids]
+    
     def load_document_state(self, doc_id: str) -> Optional[DocumentState]:
         """加载文档状态
         
@@ -289,9 +330,12 @@ class IncrementalProcessor:
         if state is None:
             logger.info(f"新文档 {doc_id}，处理所有块")
             
-            # 处理所有块
+            # 处理所有块，同时累计文本字符数
             all_nodes = []
+            text_chars = 0
             for i, chunk in enumerate(chunks):
+                text_chars += len(chunk)
+
                 # 创建块元数据
                 chunk_metadata = metadata.copy()
                 chunk_metadata["chunk_index"] = i
@@ -301,7 +345,7 @@ class IncrementalProcessor:
                 all_nodes.extend(nodes)
             
             # 添加节点到向量存储
-            node_ids = await self.vector_store_manager.add_nodes(all_nodes, datasource_name)
+            node_ids = await self._batched_add_nodes(all_nodes, datasource_name)
             
             # 保存文档状态
             new_state = DocumentState(
@@ -321,7 +365,7 @@ class IncrementalProcessor:
                 "metadata": metadata,
                 "status": "success",
                 "node_count": len(node_ids),
-                "text_chars": sum(len(chunk) for chunk in chunks),
+                "text_chars": text_chars,
                 "datasource": datasource_name
             }
         
@@ -353,9 +397,12 @@ class IncrementalProcessor:
             # 删除旧节点
             await self.vector_store_manager.delete_nodes(doc_id, datasource_name)
             
-            # 处理所有块
+            # 处理所有块，同时累计文本字符数
             all_nodes = []
+            text_chars = 0
             for i, chunk in enumerate(chunks):
+                text_chars += len(chunk)
+
                 # 创建块元数据
                 chunk_metadata = metadata.copy()
                 chunk_metadata["chunk_index"] = i
@@ -365,7 +412,7 @@ class IncrementalProcessor:
                 all_nodes.extend(nodes)
             
             # 添加节点到向量存储
-            node_ids = await self.vector_store_manager.add_nodes(all_nodes, datasource_name)
+            node_ids = await self._batched_add_nodes(all_nodes, datasource_name)
             
             # 保存文档状态
             new_state = DocumentState(
@@ -385,7 +432,7 @@ class IncrementalProcessor:
                 "metadata": metadata,
                 "status": "reprocessed",
                 "node_count": len(node_ids),
-                "text_chars": sum(len(chunk) for chunk in chunks),
+                "text_chars": text_chars,
                 "datasource": datasource_name
             }
         
@@ -416,7 +463,7 @@ class IncrementalProcessor:
         # 添加节点到向量存储
         added_node_ids = []
         if added_nodes:
-            added_node_ids = await self.vector_store_manager.add_nodes(added_nodes, datasource_name)
+            added_node_ids = await self._batched_add_nodes(added_nodes, datasource_name)
         
         # 3. 更新文档状态
         # 构建新的节点ID列表
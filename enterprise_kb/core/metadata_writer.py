@@ -0,0 +1,165 @@
+"""文档元数据后台写入模块，将多次文档处理产生的元数据合并为批量upsert写入数据库"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from enterprise_kb.db.repositories.document_repository import DocumentRepository
+
+logger = logging.getLogger(__name__)
+
+# 每批最多写入的记录数
+BATCH_SIZE = 50
+
+# 队列容量，队列满时写入方等待，数据库不可用时内存不会无限增长
+QUEUE_MAXSIZE = 1000
+
+# 单批写入失败后的重试次数，及首次重试前的等待秒数（之后每次加倍）
+MAX_RETRIES = 3
+RETRY_DELAY_SECONDS = 1.0
+
+
+class MetadataWriter:
+    """元数据写入器，记录放入有界队列后由常驻后台任务批量写入数据库"""
+
+    def __init__(
+        self,
+        repository: Optional[DocumentRepository] = None,
+        batch_size: int = BATCH_SIZE,
+        maxsize: int = QUEUE_MAXSIZE,
+        max_retries: int = MAX_RETRIES,
+        retry_delay: float = RETRY_DELAY_SECONDS
+    ):
+        """
+        初始化元数据写入器
+
+        Args:
+            repository: 文档仓库，默认使用共享连接池的仓库
+            batch_size: 每批最多写入的记录数
+            maxsize: 队列容量
+            max_retries: 单批写入失败后的重试次数
+            retry_delay: 首次重试前的等待秒数
+        """
+        self._repository = repository or DocumentRepository()
+        self.batch_size = batch_size
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+        # 队列及后台任务在首次使用时于当前事件循环中创建
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def _get_queue(self) -> asyncio.Queue:
+        """
+        获取写入队列，必要时在当前事件循环中创建队列并启动后台写入任务
+
+        后台任务的引用保存在实例上，避免任务在执行过程中被垃圾回收
+
+        Returns:
+            元数据写入队列
+        """
+        loop = asyncio.get_running_loop()
+        worker = self._worker
+        if worker is None or worker.done() or worker.get_loop() is not loop:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def put(self, document_data: Dict[str, Any]) -> None:
+        """
+        将文档元数据放入写入队列，队列已满时等待后台任务写出
+
+        Args:
+            document_data: 文档数据
+        """
+        await self._get_queue().put(document_data)
+
+    def _is_running(self) -> bool:
+        """后台任务是否在当前事件循环中运行"""
+        worker = self._worker
+        return (
+            worker is not None
+            and not worker.done()
+            and worker.get_loop() is asyncio.get_running_loop()
+        )
+
+    async def flush(self) -> None:
+        """等待队列中已有的记录全部写入（或在重试耗尽后放弃）"""
+        if self._is_running():
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """写出队列中剩余的记录并停止后台任务，应用关闭时调用"""
+        if not self._is_running():
+            return
+        await self.flush()
+        worker = self._worker
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        self._queue = None
+        self._worker = None
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """
+        后台写入元数据，每次取出队列中已有的记录（最多一批）一起写入
+
+        Args:
+            queue: 元数据写入队列
+        """
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        通过一条upsert语句写入整批记录，失败时按指数退避重试
+
+        Args:
+            documents: 文档数据列表
+        """
+        doc_ids = ', '.join(str(doc['id']) for doc in documents)
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._repository.upsert_many(documents)
+                logger.info(f"存储文档元数据成功: {doc_ids}")
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"存储元数据到数据库失败，已重试{self.max_retries}次，放弃写入: {doc_ids}, {str(e)}")
+                    return
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning(f"存储元数据到数据库失败，{delay}秒后重试: {str(e)}")
+                await asyncio.sleep(delay)
+
+
+# 全局写入器实例，所有文档处理器共享同一个队列
+_metadata_writer: Optional[MetadataWriter] = None
+
+
+def get_metadata_writer() -> MetadataWriter:
+    """
+    获取元数据写入器实例
+
+    Returns:
+        元数据写入器实例
+    """
+    global _metadata_writer
+    if _metadata_writer is None:
+        _metadata_writer = MetadataWriter()
+    return _metadata_writer
+
+
+async def close_metadata_writer() -> None:
+    """写出剩余的元数据并停止后台写入任务"""
+    if _metadata_writer is not None:
+        await _metadata_writer.close()
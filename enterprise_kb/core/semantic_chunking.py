@@ -17,6 +17,10 @@ from enterprise_kb.core.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# 预编译的固定模式，避免每次调用时重新查找或编译
+_PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+_SENTENCE_FALLBACK_RE = re.compile(r'[.!?]+\s+')
+
 # 确保NLTK资源已下载
 try:
     nltk.data.find('tokenizers/punkt')
@@ -54,6 +58,7 @@ class SemanticChunker(NodeParser):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.paragraph_separator = paragraph_separator
+        self.paragraph_split_pattern = re.compile(paragraph_separator)
         self.sentence_separator = sentence_separator
         self.heading_pattern = re.compile(heading_pattern, re.MULTILINE)
         self.list_pattern = re.compile(list_pattern, re.MULTILINE)
@@ -229,7 +234,7 @@ class SemanticChunker(NodeParser):
             文本块列表
         """
         # 分割为段落
-        paragraphs = re.split(self.paragraph_separator, text)
+        paragraphs = self.paragraph_split_pattern.split(text)
         
         # 合并段落成块
         chunks = []
@@ -554,7 +559,7 @@ class HierarchicalChunker(NodeParser):
             段落列表，每个段落包含文本和元数据
         """
         # 尝试按段落分割
-        paragraphs = re.split(r'\n\s*\n', text)
+        paragraphs = _PARAGRAPH_BREAK_RE.split(text)
         
         # 构建段落
         sections = []
@@ -626,7 +631,7 @@ class HierarchicalChunker(NodeParser):
             sentences = sent_tokenize(text)
         except:
             # 回退到简单分割
-            sentences = re.split(r'[.!?]+\s+', text)
+            sentences = _SENTENCE_FALLBACK_RE.split(text)
         
         # 构建子段落
         subsections = []
@@ -13,7 +13,7 @@ from functools import lru_cache
 
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import task_success, task_failure, worker_ready, setup_logging
+from celery.signals import task_success, task_failure, worker_ready, worker_shutdown, setup_logging
 from kombu import Exchange, Queue
 
 from enterprise_kb.core.config.settings import settings
@@ -233,6 +233,13 @@ def worker_ready_handler(**kwargs):
     """Worker就绪处理"""
     logger.info("Celery worker已就绪")
 
+@worker_shutdown.connect
+def worker_shutdown_handler(**kwargs):
+    """Worker关闭处理，释放文档处理使用的进程池"""
+    # 文档处理模块依赖较重，仅在Worker关闭时导入
+    from enterprise_kb.core.document_pipeline.processors import shutdown_pdf_pool
+    shutdown_pdf_pool()
+
 @celery_app.task(bind=True)
 def debug_task(self):
     """调试任务，用于测试Celery配置"""
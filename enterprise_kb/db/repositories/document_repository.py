@@ -2,14 +2,24 @@
 from typing import Dict, Any, List, Tuple, Optional
 from datetime import datetime
 from sqlalchemy import select, update, delete, func
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from enterprise_kb.db.models.documents import DocumentModel
 from enterprise_kb.models.schemas import DocumentStatus
-from enterprise_kb.db.session import get_session
+from enterprise_kb.db.session import async_session_factory
 
 class DocumentRepository:
     """文档仓库，处理文档数据库操作"""
+
+    def __init__(self, session_factory: Optional[async_sessionmaker] = None):
+        """
+        初始化文档仓库
+
+        Args:
+            session_factory: 会话工厂，默认使用共享连接池的全局会话工厂
+        """
+        self._session_factory = session_factory or async_session_factory
     
     async def create(self, document_data: Dict[str, Any]) -> str:
         """
@@ -21,12 +31,47 @@ class DocumentRepository:
         Returns:
             创建的文档ID
         """
-        async with get_session() as session:
+        async with self._session_factory() as session:
             document = DocumentModel(**document_data)
             session.add(document)
             await session.commit()
             await session.refresh(document)
             return document.id
+
+    async def upsert(self, document_data: Dict[str, Any]) -> None:
+        """
+        创建或更新文档，单条语句完成
+
+        Args:
+            document_data: 文档数据
+        """
+        await self.upsert_many([document_data])
+
+    async def upsert_many(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        批量创建或更新文档，使用一条INSERT ... ON DUPLICATE KEY UPDATE语句完成
+
+        已存在的文档保留原创建时间，其余字段以新数据为准
+
+        Args:
+            documents: 文档数据列表，各条记录的字段需一致
+        """
+        if not documents:
+            return
+
+        # 元数据字段在模型中为doc_metadata
+        rows = [
+            {("doc_metadata" if key == "metadata" else key): value for key, value in data.items()}
+            for data in documents
+        ]
+        stmt = insert(DocumentModel).values(rows)
+        stmt = stmt.on_duplicate_key_update({
+            key: stmt.inserted[key] for key in rows[0] if key not in ("id", "created_at")
+        })
+
+        async with self._session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
             
     async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -38,7 +83,7 @@ class DocumentRepository:
         Returns:
             文档数据，如果不存在则返回None
         """
-        async with get_session() as session:
+        async with self._session_factory() as session:
             result = await session.execute(
                 select(DocumentModel).where(DocumentModel.id == doc_id)
             )
@@ -60,7 +105,7 @@ class DocumentRepository:
         Returns:
             更新是否成功
         """
-        async with get_session() as session:
+        async with self._session_factory() as session:
             result = await session.execute(
                 update(DocumentModel)
                 .where(DocumentModel.id == doc_id)
@@ -102,7 +147,7 @@ class DocumentRepository:
         Returns:
             删除是否成功
         """
-        async with get_session() as session:
+        async with self._session_factory() as session:
             result = await session.execute(
                 delete(DocumentModel).where(DocumentModel.id == doc_id)
             )
@@ -129,7 +174,7 @@ class DocumentRepository:
         """
         filters = filters or {}
         
-        async with get_session() as session:
+        async with self._session_factory() as session:
             # 构建查询
             query = select(DocumentModel)
             count_query = select(func.count()).select_from(DocumentModel)
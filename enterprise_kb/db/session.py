@@ -9,16 +9,15 @@ from enterprise_kb.core.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
-# 创建异步引擎
+# 创建异步引擎，进程内所有会话共享同一连接池
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,  # 使用DEBUG代替DB_ECHO
     future=True,
-    # 使用默认值，以防设置中没有这些属性
-    pool_size=getattr(settings, "DB_POOL_SIZE", 5),
-    max_overflow=getattr(settings, "DB_MAX_OVERFLOW", 10),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
     pool_pre_ping=True,
-    pool_recycle=3600
+    pool_recycle=settings.DB_POOL_RECYCLE
 )
 
 # 创建会话工厂
@@ -26,6 +26,8 @@ from enterprise_kb.core.config.settings import settings
 from enterprise_kb.core.cache import setup_cache
 from enterprise_kb.core.limiter import setup_limiter
 from enterprise_kb.core.config.logging import configure_logging, get_logger
+from enterprise_kb.core.document_pipeline.processors import shutdown_pdf_pool
+from enterprise_kb.core.metadata_writer import close_metadata_writer
 
 # 配置统一日志
 configure_logging()
@@ -45,6 +47,8 @@ async def lifespan(app: FastAPI):
     # 应用关闭时清理
     await app.state.close_cache()
     await app.state.close_limiter()
+    await close_metadata_writer()
+    shutdown_pdf_pool()
     logger.info("应用正在关闭，执行清理操作")
     # 执行其他必要的清理工作
 
@@ -119,7 +119,7 @@ class DocumentService:
             now = datetime.now()
             
             # 保存文件
-            file_path = processor.save_uploaded_file(file_content, filename)
+            file_path = await processor.save_uploaded_file(file_content, filename)
             
             # 获取文件类型
             file_type = os.path.splitext(filename)[1].lower().lstrip(".")
@@ -1,5 +1,7 @@
 """文档处理器模块"""
 import os
+import asyncio
+import functools
 import logging
 import uuid
 import re
@@ -24,6 +26,7 @@ from enterprise_kb.core.config.settings import settings
 from enterprise_kb.storage.vector_store import get_storage_context
 from enterprise_kb.utils.milvus_client import get_milvus_client
 from enterprise_kb.storage.datasource.milvus import MilvusDataSource, MilvusDataSourceConfig
+from enterprise_kb.utils.file_type import detect_file_type
 
 logger = logging.getLogger(__name__)
 
@@ -638,6 +641,32 @@ class AdaptiveChunkingStrategy:
                 chunk_overlap=params["chunk_overlap"]
             )
 
+# 各扩展名使用的Reader类，其余类型（txt、md、csv等）按纯文本读取
+_READER_CLASSES = {
+    ".pdf": PyMuPDFReader,
+    ".docx": DocxReader,
+    ".doc": UnstructuredReader,
+    ".ppt": UnstructuredReader,
+    ".pptx": UnstructuredReader,
+    ".xls": UnstructuredReader,
+    ".xlsx": UnstructuredReader,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _get_reader(reader_class: type) -> Any:
+    """
+    获取共享的Reader实例，每种Reader只在首次使用时创建一次
+
+    Args:
+        reader_class: Reader类
+
+    Returns:
+        Reader实例
+    """
+    return reader_class()
+
+
 class DocumentProcessor:
     """文档处理器"""
 
@@ -671,6 +700,35 @@ class DocumentProcessor:
         )
         self.milvus_datasource = MilvusDataSource(self.milvus_config)
 
+    def get_reader_for_file(self, file_path: str) -> Optional[Any]:
+        """
+        根据文件类型获取Reader，所有处理器实例共享同一组Reader
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            Reader实例，没有对应Reader时返回None
+        """
+        reader_class = _READER_CLASSES.get(f".{detect_file_type(file_path)}")
+        return _get_reader(reader_class) if reader_class is not None else None
+
+    async def _load_documents(self, reader: Any, file_path: str, metadata: Dict[str, Any]) -> List[Document]:
+        """
+        在线程中使用Reader加载文档，避免阻塞事件循环
+
+        读取以文件I/O为主，使用线程而非进程池，也可在Celery等守护进程中运行
+
+        Args:
+            reader: 文档Reader
+            file_path: 文件路径
+            metadata: 文档元数据
+
+        Returns:
+            加载的文档列表
+        """
+        return await asyncio.to_thread(reader.load, file_path, metadata=metadata)
+
     async def process_document(
         self,
         file_path: str,
@@ -704,9 +762,8 @@ class DocumentProcessor:
             doc_id = metadata["doc_id"]
             logger.info(f"开始处理文档: {file_path}, doc_id: {doc_id}")
 
-            # 确定文档类型
-            file_ext = os.path.splitext(file_path)[1].lower()
-            doc_type = file_ext.lstrip(".")
+            # 确定文档类型，扩展名与内容不符时以内容为准
+            doc_type = detect_file_type(file_path)
 
             # 首先分析文档特征
             features, complexity = await self._analyze_document(file_path, doc_type)
@@ -718,13 +775,13 @@ class DocumentProcessor:
             if convert_to_markdown:
                 # 使用MarkItDown转换文档
                 logger.info(f"转换文档为Markdown: {file_path}")
-                content = self.convert_to_markdown(file_path)
+                content = await asyncio.to_thread(self.convert_to_markdown, file_path)
                 documents = [Document(text=content, metadata=metadata)]
             else:
                 # 使用标准Reader
                 reader = self.get_reader_for_file(file_path)
                 if reader:
-                    documents = reader.load(file_path, metadata=metadata)
+                    documents = await self._load_documents(reader, file_path, metadata)
                     logger.info(f"使用 {reader.__class__.__name__} 加载文档: {file_path}")
                 else:
                     # 回退到纯文本
@@ -743,8 +800,8 @@ class DocumentProcessor:
                 callback_manager=callback_manager
             )
 
-            # 处理文档
-            nodes = pipeline.run(documents=documents)
+            # 处理文档，分块在线程中执行；令牌计数回调需要更新本进程中的计数器，不使用进程池
+            nodes = await asyncio.to_thread(pipeline.run, documents=documents)
 
             # 添加到向量存储
             if nodes:
@@ -794,7 +851,7 @@ class DocumentProcessor:
                 if store_metadata:
                     try:
                         # 导入必要的模块
-                        from enterprise_kb.db.repositories.document_repository import DocumentRepository
+                        from enterprise_kb.core.metadata_writer import get_metadata_writer
                         from enterprise_kb.schemas.documents import DocumentStatus
 
                         # 获取文件名
@@ -819,14 +876,10 @@ class DocumentProcessor:
                             "updated_at": datetime.now()
                         }
 
-                        # 创建文档仓库
-                        doc_repo = DocumentRepository()
-
-                        # 异步存储元数据
-                        import asyncio
-                        asyncio.create_task(self._store_metadata_to_db(doc_repo, document_data))
+                        # 放入队列，由后台任务批量写入数据库，队列已满时等待
+                        await get_metadata_writer().put(document_data)
 
-                        logger.info(f"已创建异步任务存储文档元数据: {doc_id}")
+                        logger.info(f"已加入元数据写入队列: {doc_id}")
                     except Exception as e:
                         logger.error(f"准备存储元数据失败: {str(e)}")
 
@@ -848,30 +901,6 @@ class DocumentProcessor:
                 "error": str(e)
             }
 
-    async def _store_metadata_to_db(self, doc_repo, document_data: Dict[str, Any]) -> None:
-        """
-        异步存储元数据到数据库
-
-        Args:
-            doc_repo: 文档仓库实例
-            document_data: 文档数据
-        """
-        try:
-            # 检查文档是否已存在
-            existing_doc = await doc_repo.get(document_data["id"])
-
-            if existing_doc:
-                # 更新现有文档
-                await doc_repo.update(document_data["id"], document_data)
-                logger.info(f"更新文档元数据成功: {document_data['id']}")
-            else:
-                # 创建新文档
-                await doc_repo.create(document_data)
-                logger.info(f"创建文档元数据成功: {document_data['id']}")
-
-        except Exception as e:
-            logger.error(f"存储元数据到数据库失败: {str(e)}")
-
     async def delete_document_vectors(self, doc_id: str) -> bool:
         """
         从Milvus向量数据库中删除文档的向量数据
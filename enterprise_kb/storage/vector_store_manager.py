@@ -194,7 +194,8 @@ class VectorStoreManager:
             
         try:
             vector_store = self.vector_stores[datasource_name]
-            return vector_store.add(nodes)
+            # 向量存储客户端的写入为阻塞调用，在线程中执行，多个批次可以并发写入
+            return await asyncio.to_thread(vector_store.add, nodes)
         except Exception as e:
             logger.error(f"添加节点失败: {str(e)}")
             raise ValueError(f"添加节点失败: {str(e)}")
@@ -233,6 +234,28 @@ class VectorStoreManager:
             logger.error(f"删除节点失败: {str(e)}")
             return False
     
+    async def delete_node_ids(self, node_ids: List[str], datasource_name: str) -> None:
+        """按节点ID删除指定数据源中的节点
+        
+        Args:
+            node_ids: 节点ID列表
+            datasource_name: 数据源名称
+            
+        Raises:
+            ValueError: 数据源不存在或删除失败
+        """
+        if datasource_name not in self.vector_stores:
+            raise ValueError(f"数据源 '{datasource_name}' 不存在或不支持向量存储")
+        if not node_ids:
+            return
+            
+        try:
+            vector_store = self.vector_stores[datasource_name]
+            await asyncio.to_thread(vector_store.delete_nodes, node_ids=node_ids)
+        except Exception as e:
+            logger.error(f"删除节点失败: {str(e)}")
+            raise ValueError(f"删除节点失败: {str(e)}")
+    
     async def query(
         self, 
         query_embedding: List[float],
@@ -0,0 +1,125 @@
+"""
+文件类型识别
+
+在扩展名之外读取文件头部内容判断真实格式，避免扩展名错误的文件进入不匹配的处理流程
+"""
+import functools
+import logging
+import os
+import zipfile
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 可选使用libmagic识别文件内容，未安装python-magic时只按扩展名判断
+try:
+    import magic as _magic
+except ImportError:
+    _magic = None
+
+# 识别格式时读取的文件头部字节数
+SNIFF_BYTES = 512
+
+# 可由文件头部可靠识别的二进制文档格式，识别结果与扩展名不同时以内容为准
+# 文本类格式（txt、md、html等）无法仅凭头部区分，仍以扩展名为准
+_MIME_TO_TYPE = {
+    "application/pdf": "pdf",
+    "application/msword": "doc",
+    "application/vnd.ms-excel": "xls",
+    "application/vnd.ms-powerpoint": "ppt",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
+}
+
+# 只读取头部时libmagic将Office Open XML文档识别为普通zip，需要查看包内[Content_Types].xml
+_ZIP_MIME_TYPES = frozenset({"application/zip", "application/x-zip-compressed"})
+
+# [Content_Types].xml中主文档部件的内容类型与文件类型的对应关系
+_OOXML_MAIN_PARTS = {
+    b"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml": "docx",
+    b"application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml": "xlsx",
+    b"application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml": "pptx",
+}
+
+
+def extension_type(file_path: str) -> str:
+    """
+    按扩展名获取文件类型
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        小写、不带点的扩展名
+    """
+    return os.path.splitext(file_path)[1].lower().lstrip(".")
+
+
+@functools.lru_cache(maxsize=1024)
+def _sniff_type(file_path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """
+    读取文件头部判断格式，同一路径在文件未修改时只读取一次
+
+    Args:
+        file_path: 文件路径
+        mtime_ns: 文件修改时间，作为缓存键的一部分
+        size: 文件大小，作为缓存键的一部分
+
+    Returns:
+        识别出的文件类型，无法可靠识别时返回None
+    """
+    with open(file_path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+    mime = _magic.from_buffer(head, mime=True)
+    if mime in _ZIP_MIME_TYPES:
+        return _ooxml_type(file_path)
+    return _MIME_TO_TYPE.get(mime)
+
+
+def _ooxml_type(file_path: str) -> Optional[str]:
+    """
+    根据zip包内的[Content_Types].xml判断Office Open XML文档类型
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        docx、xlsx或pptx，不是Office Open XML文档时返回None
+    """
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            content_types = archive.read("[Content_Types].xml")
+    except (zipfile.BadZipFile, KeyError):
+        return None
+    for part_type, file_type in _OOXML_MAIN_PARTS.items():
+        if part_type in content_types:
+            return file_type
+    return None
+
+
+def detect_file_type(file_path: str) -> str:
+    """
+    识别文件类型，优先依据文件内容，无法识别时使用扩展名
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        小写、不带点的文件类型，如pdf、docx、txt
+    """
+    ext = extension_type(file_path)
+    if _magic is None:
+        return ext
+
+    try:
+        stat = os.stat(file_path)
+        sniffed = _sniff_type(file_path, stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        logger.debug(f"识别文件内容类型失败，使用扩展名: {file_path}, {str(e)}")
+        return ext
+
+    if sniffed and sniffed != ext:
+        logger.info(f"文件内容类型与扩展名不一致，按内容处理: {file_path}, {ext} -> {sniffed}")
+        return sniffed
+    return ext
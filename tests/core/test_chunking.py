@@ -0,0 +1,220 @@
+"""文本分块等价性测试模块
+
+分块切分位置改由长度打包函数计算后，结果应与原先逐段、逐句拼接字符串的实现一致
+"""
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from enterprise_kb.core.document_pipeline import processors
+from enterprise_kb.core.document_pipeline.processors import ChunkingProcessor
+
+MAX_SIZE = 40
+
+
+@pytest.fixture
+def chunker(monkeypatch):
+    """块大小为MAX_SIZE的分块处理器"""
+    test_settings = SimpleNamespace(**processors.settings.model_dump(), MAX_CHUNK_SIZE=MAX_SIZE)
+    monkeypatch.setattr(processors, "settings", test_settings)
+    return ChunkingProcessor()
+
+
+def reference_chunk_text(chunker, text):
+    """原先按段落拼接字符串的通用文本分块实现"""
+    chunks = []
+    current_chunk = ""
+    current_size = 0
+
+    for para in text.split('\n\n'):
+        para_size = len(para)
+        if para_size > MAX_SIZE:
+            if current_chunk:
+                chunks.append(current_chunk)
+                current_chunk = ""
+                current_size = 0
+            chunks.extend(chunker._split_large_paragraph(para))
+            continue
+
+        if current_size + para_size > MAX_SIZE:
+            chunks.append(current_chunk)
+            current_chunk = para
+            current_size = para_size
+        else:
+            if current_chunk:
+                current_chunk += "\n\n" + para
+            else:
+                current_chunk = para
+            current_size += para_size
+
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def reference_chunk_sentences(chunker, sentences, max_size):
+    """原先逐句拼接字符串的带重叠句子分块实现"""
+    chunks = []
+    current_chunk = ""
+    last_added_index = -1
+
+    for i, sentence in enumerate(sentences):
+        if len(sentence) > max_size:
+            if current_chunk:
+                chunks.append(current_chunk)
+                current_chunk = ""
+            chunks.extend(chunker._split_by_size(sentence, max_size, 0))
+            last_added_index = i
+            continue
+
+        if current_chunk and len(current_chunk) + len(sentence) + 1 > max_size:
+            chunks.append(current_chunk)
+            overlap_start = max(last_added_index - 2, 0)
+            current_chunk = " ".join(sentences[overlap_start:i]) + " " + sentence
+        elif current_chunk:
+            current_chunk += " " + sentence
+        else:
+            current_chunk = sentence
+        last_added_index = i
+
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def random_pieces(rng, count):
+    """生成长度从0到超过MAX_SIZE不等的文本片段"""
+    return [
+        "".join(rng.choice("abc. 中文") for _ in range(rng.choice([0, 0, 3, 12, 25, 39, 40, 41, 90])))
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_chunk_text_matches_reference(chunker, seed):
+    """测试按段落长度打包的通用分块与逐段拼接的结果一致"""
+    rng = random.Random(seed)
+    text = "\n\n".join(random_pieces(rng, rng.randint(1, 30)))
+
+    assert chunker._chunk_text(text) == reference_chunk_text(chunker, text)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_chunk_sentences_matches_reference(chunker, seed):
+    """测试按句子长度打包的重叠分块与逐句拼接的结果一致"""
+    rng = random.Random(seed)
+    sentences = random_pieces(rng, rng.randint(1, 30))
+
+    assert chunker._chunk_sentences_with_overlap(sentences, MAX_SIZE, 0) == \
+        reference_chunk_sentences(chunker, sentences, MAX_SIZE)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", []),
+    ("\n\n第一段", ["第一段"]),
+    ("a" * 20 + "\n\n" + "b" * 20 + "\n\n" + "c" * 5, ["a" * 20 + "\n\n" + "b" * 20, "c" * 5]),
+])
+def test_chunk_text_edge_cases(chunker, text, expected):
+    """测试空文本、以空段落开头和恰好填满的分块"""
+    assert chunker._chunk_text(text) == expected
+
+
+def test_chunk_by_headings(chunker):
+    """测试按标题分块，块在超过大小限制前切分"""
+    text = "# 标题一\n" + "x" * 30 + "\n" + "y" * 10 + "\n## 标题二\n内容"
+
+    assert chunker._chunk_by_headings(text, ["#"]) == [
+        "# 标题一\n" + "x" * 30,
+        "y" * 10,
+        "## 标题二\n内容",
+    ]
+
+
+def test_split_large_paragraph(chunker):
+    """测试大段落按句子切分，超长句子按固定长度切分"""
+    paragraph = "First sentence here. Second one! " + "z" * 50
+
+    assert chunker._split_large_paragraph(paragraph) == [
+        "First sentence here. Second one!",
+        "z" * 40,
+        "z" * 10,
+    ]
+
+
+@pytest.mark.skipif(processors._njit is None, reason="未安装numba")
+@pytest.mark.parametrize("pack, pack_jit", [
+    (processors._pack_paragraphs, processors._pack_paragraphs_jit),
+    (processors._pack_sentences, processors._pack_sentences_jit),
+])
+def test_jit_kernels_match_python(pack, pack_jit):
+    """测试numba编译的打包函数与纯Python实现结果一致"""
+    rng = random.Random(0)
+    for _ in range(20):
+        lengths = [rng.choice([0, 3, 12, 39, 40, 41, 90]) for _ in range(rng.randint(1, 30))]
+        n = len(lengths)
+        expected = ([0] * (2 * n), [0] * (2 * n), [False] * (2 * n))
+        count = pack(lengths, MAX_SIZE, *expected)
+
+        actual = (np.empty(2 * n, dtype=np.int64), np.empty(2 * n, dtype=np.int64), np.empty(2 * n, dtype=np.bool_))
+        assert pack_jit(np.asarray(lengths, dtype=np.int64), MAX_SIZE, *actual) == count
+        for column, actual_column in zip(expected, actual):
+            assert actual_column[:count].tolist() == column[:count]
+
+
+def longest_overlap(previous, following):
+    """前一块结尾与后一块开头重合的最大长度"""
+    for size in range(min(len(previous), len(following)), 0, -1):
+        if previous.endswith(following[:size]):
+            return size
+    return 0
+
+
+def native_splitter_settings():
+    """启用semantic-text-splitter的测试配置"""
+    return SimpleNamespace(**{**processors.settings.model_dump(), "NATIVE_TEXT_SPLITTER_ENABLED": True})
+
+
+def test_native_splitter_respects_recursive_limits(monkeypatch):
+    """测试semantic-text-splitter分块遵守与递归重叠分块相同的大小和重叠限制"""
+    pytest.importorskip("semantic_text_splitter")
+    max_size, overlap_size = 120, 20
+    rng = random.Random(0)
+    # 段落不超过max_size，递归重叠分块只按段落打包
+    text = "\n\n".join(
+        " ".join(f"Sentence {p}-{i} has {rng.randint(2, 9) * 'x'} words." for i in range(rng.randint(1, 3)))
+        for p in range(30)
+    )
+    monkeypatch.setattr(processors, "settings", native_splitter_settings())
+    processor = ChunkingProcessor()
+
+    native = processor._split_plain_text(text, max_size, overlap_size)
+    recursive = processor._recursive_overlap_chunking(text, max_size, overlap_size)
+
+    assert native == list(processors._get_native_splitter(max_size, overlap_size).chunks(text))
+    assert native and recursive
+    assert max(len(chunk) for chunk in native) <= max_size
+    # 递归重叠分块把重叠部分拼在新段落前，不再检查大小
+    assert max(len(chunk) for chunk in recursive) <= max_size + overlap_size + 2
+    assert all(longest_overlap(a, b) <= overlap_size for a, b in zip(native, native[1:]))
+    assert all(longest_overlap(a, b) <= overlap_size for a, b in zip(recursive, recursive[1:]))
+    # 两种方式都不丢失内容
+    words = set(text.split())
+    assert set(" ".join(native).split()) == words
+    assert all(any(para in chunk for chunk in recursive) for para in text.split("\n\n"))
+
+
+def test_native_splitter_incompatible_version_falls_back(monkeypatch):
+    """测试semantic-text-splitter构造参数不兼容时回退到递归重叠分块"""
+    def incompatible_splitter(capacity, **kwargs):
+        raise TypeError("unexpected keyword argument 'overlap'")
+
+    monkeypatch.setattr(processors, "_NativeTextSplitter", incompatible_splitter)
+    monkeypatch.setattr(processors, "settings", native_splitter_settings())
+    processors._get_native_splitter.cache_clear()
+    processor = ChunkingProcessor()
+    text = "First paragraph here.\n\n" + "Second paragraph. " * 10
+
+    assert processor._split_plain_text(text, 60, 10) == processor._recursive_overlap_chunking(text, 60, 10)
+    processors._get_native_splitter.cache_clear()
@@ -0,0 +1,358 @@
+"""文档处理器测试模块"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from enterprise_kb.core.document_pipeline import processors
+from enterprise_kb.core.document_pipeline.processors import (
+    ChunkingProcessor,
+    ContextCompressorProcessor,
+    DocxProcessor,
+    HTMLProcessor,
+    MarkItDownProcessor,
+    VectorizationProcessor,
+)
+
+
+@pytest.fixture
+def markitdown_processor():
+    """MarkItDown处理器实例"""
+    return MarkItDownProcessor()
+
+
+def extract_structure(processor, markdown_content):
+    """提取文档结构并返回结果"""
+    context = {}
+    processor._extract_document_structure(markdown_content, context)
+    return context['document_structure']
+
+
+def test_extract_structure_headings_code_and_images(markitdown_processor):
+    """测试标题、代码块和图片的识别"""
+    structure = extract_structure(
+        markitdown_processor,
+        "# 标题一\n\n![图](a.png)\n\n```python\nx = 1\n```\n\n## 标题二\n"
+    )
+
+    assert structure['headings'] == [(1, "标题一"), (2, "标题二")]
+    assert structure['code_blocks'] == [("python", "x = 1\n")]
+    assert structure['images'] == [("图", "a.png")]
+
+
+def test_extract_structure_skips_headings_inside_code(markitdown_processor):
+    """测试代码块内的注释行不作为标题"""
+    structure = extract_structure(markitdown_processor, "```bash\n# 注释\n```\n# 正文\n")
+
+    assert structure['headings'] == [(1, "正文")]
+    assert structure['code_blocks'] == [("bash", "# 注释\n")]
+
+
+def test_extract_structure_unclosed_fence(markitdown_processor):
+    """测试未闭合的代码块围栏之后的内容仍被识别"""
+    structure = extract_structure(markitdown_processor, "# A\n```python\nx=1\n# B\n![i](p.png)\n")
+
+    assert structure['headings'] == [(1, "A"), (1, "B")]
+    assert structure['code_blocks'] == []
+    assert structure['images'] == [("i", "p.png")]
+
+
+def test_extract_structure_indented_fence(markitdown_processor):
+    """测试缩进的围栏不开启代码块，其中内容按普通文本识别"""
+    structure = extract_structure(markitdown_processor, "# A\n  ```\n  code\n# B\n  ```\n")
+
+    assert structure['headings'] == [(1, "A"), (1, "B")]
+    assert structure['code_blocks'] == []
+
+
+@pytest.mark.parametrize("markdown_content, expected", [
+    ("**粗体**、*斜体*和 __underline__", "粗体、斜体和 underline"),
+    ("`inline code` 保留内容", "inline code 保留内容"),
+    ("# 标题\n[链接](http://example.com)", "标题\n链接"),
+    ("2 * 3 = 6", "2 * 3 = 6"),
+    ("snake__case__name", "snake__case__name"),
+    ("a ** b ** c", "a ** b ** c"),
+])
+def test_docx_markdown_to_text(markdown_content, expected):
+    """测试Markdown转纯文本只去除成对的强调和代码符号"""
+    assert DocxProcessor()._markdown_to_text(markdown_content) == expected
+
+
+def test_docx_skips_markitdown_after_failure(monkeypatch):
+    """测试MarkItDown已转换失败时Word处理器不再重试转换"""
+    def fail_convert(self, file_path):
+        raise AssertionError("不应重试MarkItDown转换")
+
+    paragraphs = [SimpleNamespace(text="第一段"), SimpleNamespace(text="第二段")]
+    monkeypatch.setattr(DocxProcessor, "_convert_to_markdown", fail_convert)
+    monkeypatch.setattr(processors.docx, "Document", lambda path: SimpleNamespace(paragraphs=paragraphs), raising=False)
+
+    context = DocxProcessor().process({
+        "file_type": "docx",
+        "file_path": "a.docx",
+        "markdown_conversion_failed": True,
+    })
+
+    assert context["text_content"] == "第一段\n第二段"
+    assert context["paragraph_count"] == 2
+    assert "markdown_content" not in context
+
+
+class BatchEmbedModel:
+    """按批返回未归一化向量的嵌入模型"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_text_embedding_batch(self, texts):
+        self.calls += 1
+        return [[3.0 * len(text), 4.0 * len(text)] for text in texts]
+
+
+class EncodeEmbedModel:
+    """提供encode接口的本地嵌入模型"""
+
+    def encode(self, texts, batch_size, convert_to_numpy, normalize_embeddings):
+        vectors = np.array([[3.0 * len(text), 4.0 * len(text)] for text in texts])
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def test_vectorization_without_model_only_counts_nodes():
+    """测试未传入嵌入模型时不计算向量"""
+    context = VectorizationProcessor().process({"chunks": ["a", "bb"]})
+
+    assert context["node_count"] == 2
+    assert "embeddings" not in context
+
+
+def test_vectorization_normalizes_both_model_kinds():
+    """测试两种嵌入接口得到相同的归一化向量"""
+    chunks = ["a", "bb", "ccc"]
+    batch_model = BatchEmbedModel()
+
+    batch_vectors = VectorizationProcessor(batch_model).process({"chunks": chunks})["embeddings"]
+    encode_vectors = VectorizationProcessor(EncodeEmbedModel()).process({"chunks": chunks})["embeddings"]
+
+    np.testing.assert_allclose(batch_vectors, encode_vectors, rtol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(batch_vectors, axis=1), 1.0, rtol=1e-6)
+
+
+@pytest.fixture
+def structure_cache(monkeypatch):
+    """使用空的小容量结构缓存"""
+    monkeypatch.setattr(processors, "_structure_cache", processors.OrderedDict())
+    monkeypatch.setattr(processors, "_structure_cache_chars", 0)
+    monkeypatch.setattr(processors, "_STRUCTURE_CACHE_MAX_CHARS", 100)
+    monkeypatch.setattr(processors, "_STRUCTURE_CACHE_MAX_DOC_CHARS", 40)
+    return processors
+
+
+def test_structure_cache_reuses_parse(structure_cache):
+    """测试相同文本复用缓存的解析结果"""
+    chunker = ChunkingProcessor()
+    text = "# 标题\n\n正文"
+
+    assert chunker._parse_markdown_structure(text) is chunker._parse_markdown_structure(text)
+
+
+def test_structure_cache_bounded_by_text_size(structure_cache):
+    """测试结构缓存按文本总量淘汰，过大的文档不缓存"""
+    chunker = ChunkingProcessor()
+    for i in range(10):
+        chunker._parse_markdown_structure(f"# 标题{i}\n\n" + "正文" * 10)
+    chunker._parse_markdown_structure("# 大文档\n\n" + "正文" * 50)
+
+    assert structure_cache._structure_cache_chars <= 100
+    assert structure_cache._structure_cache_chars == sum(
+        size for _, size in structure_cache._structure_cache.values()
+    )
+    assert len(structure_cache._structure_cache) < 10
+
+
+def test_parse_structure_references_are_dicts(structure_cache):
+    """测试解析后的引用关系为字典列表"""
+    chunker = ChunkingProcessor()
+    text = "# 安装说明\n\n步骤见下文\n\n## 使用\n\n参见[安装](#安装说明)和[ref:不存在]"
+
+    references = chunker._parse_markdown_structure(text)['references']
+
+    assert references == [
+        {
+            'source': {'line': 6, 'section': '使用', 'context': '参见[安装](#安装说明)和[ref:不存在]'},
+            'target': {'type': 'heading', 'title': '安装说明', 'level': 1, 'line': 0, 'id': '安装说明'},
+            'text': '安装',
+            'resolved': True
+        },
+        {
+            'source': {'line': 6, 'section': '使用', 'context': '参见[安装](#安装说明)和[ref:不存在]'},
+            'target': {'type': 'unknown', 'text': '不存在'},
+            'text': '不存在',
+            'resolved': False
+        },
+    ]
+
+
+def test_html_large_file_uses_same_extractor(monkeypatch, tmp_path):
+    """测试通过内存映射读取的大HTML文件与小文件提取出相同的文本"""
+    html_path = tmp_path / "page.html"
+    html_path.write_text("<html><body><h1>标题</h1>\r\n<p>正文<b>加粗</b></p></body></html>", encoding="utf-8")
+    processor = HTMLProcessor()
+
+    small = processor.process({'file_type': 'html', 'file_path': str(html_path)})['text_content']
+    monkeypatch.setattr(processors.settings, "MMAP_THRESHOLD_BYTES", 1)
+    large = processor.process({'file_type': 'html', 'file_path': str(html_path)})['text_content']
+
+    assert large == small
+    assert "加粗" in large
+
+
+HTML_WITH_NON_TEXT = [
+    '<script>var secret="k";alert(1)</script><p>Hello</p>',
+    '<html><head><style>p{color:red}</style><title>标题</title></head>'
+    '<body><!-- 注释 --><p>正文<b>加粗</b></p>尾部<script>x()</script>之后</body></html>',
+    '<div>前<template><p>模板</p></template>后<noscript>提示</noscript></div>',
+]
+
+
+def bs4_text(html_content):
+    """基线实现：BeautifulSoup提取的文本"""
+    bs4 = pytest.importorskip("bs4")
+    return bs4.BeautifulSoup(html_content, 'lxml').get_text(separator='\n')
+
+
+@pytest.mark.parametrize("html_content", HTML_WITH_NON_TEXT)
+def test_html_lxml_text_matches_bs4(monkeypatch, html_content):
+    """测试lxml提取的文本与BeautifulSoup一致，不包含脚本、样式和注释"""
+    pytest.importorskip("lxml")
+    monkeypatch.setattr(processors, "_SelectolaxHTMLParser", None)
+
+    assert HTMLProcessor()._extract_text(html_content) == bs4_text(html_content)
+
+
+@pytest.mark.parametrize("html_content", HTML_WITH_NON_TEXT)
+def test_html_selectolax_text_matches_bs4(html_content):
+    """测试selectolax提取的文本与BeautifulSoup一致，不包含脚本、样式和注释"""
+    if processors._SelectolaxHTMLParser is None:
+        pytest.skip("未安装selectolax")
+
+    assert HTMLProcessor()._extract_text(html_content) == bs4_text(html_content)
+
+
+def unit_vectors(count, dim=64, seed=0):
+    """生成L2归一化的float32向量矩阵和查询向量，第一行为零向量"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors[0] = 0
+    query = rng.standard_normal(dim).astype(np.float32)
+    return vectors, query / np.linalg.norm(query)
+
+
+def test_cosine_similarity_simsimd_matches_matmul():
+    """测试SimSIMD计算的float32相似度与矩阵乘法一致"""
+    pytest.importorskip("simsimd")
+    vectors, query = unit_vectors(300)
+
+    similarities = ContextCompressorProcessor()._cosine_similarity(vectors, query)
+
+    assert similarities.shape == (300,)
+    np.testing.assert_allclose(similarities, vectors @ query, atol=1e-5)
+    assert similarities[0] == 0
+
+
+def test_cosine_similarity_without_simsimd_matches_matmul(monkeypatch):
+    """测试未安装SimSIMD时使用NumPy矩阵乘法"""
+    monkeypatch.setattr(processors, "_simsimd", None)
+    vectors, query = unit_vectors(10)
+
+    similarities = ContextCompressorProcessor()._cosine_similarity(vectors, query)
+
+    np.testing.assert_allclose(similarities, vectors @ query, atol=1e-6)
+
+
+def test_cosine_similarity_int8_rescales_integer_dot():
+    """测试int8相似度为整数点积除以127²，与float32结果的差异在量化误差内"""
+    pytest.importorskip("simsimd")
+    vectors, query = unit_vectors(300)
+    quantized = ContextCompressorProcessor._quantize_unit_vectors(vectors, "int8")
+    quantized_query = ContextCompressorProcessor._quantize_unit_vectors(query, "int8")
+
+    similarities = ContextCompressorProcessor()._cosine_similarity(quantized, query)
+
+    integer_dot = quantized.astype(np.int32) @ quantized_query.astype(np.int32)
+    np.testing.assert_allclose(similarities, integer_dot / 127 ** 2, atol=1e-6)
+    np.testing.assert_allclose(similarities, vectors @ query, atol=2e-2)
+    assert similarities[0] == 0
+
+
+def test_cosine_similarity_fp16_matches_matmul():
+    """测试fp16相似度与float32矩阵乘法的差异在半精度误差内"""
+    pytest.importorskip("simsimd")
+    vectors, query = unit_vectors(300)
+    quantized = ContextCompressorProcessor._quantize_unit_vectors(vectors, "fp16")
+
+    similarities = ContextCompressorProcessor()._cosine_similarity(quantized, query)
+
+    assert similarities.dtype == np.float32
+    np.testing.assert_allclose(similarities, vectors @ query, atol=2e-3)
+
+
+class FixedEmbedModel:
+    """按文本返回预设向量的嵌入模型"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts):
+        return np.array([self.vectors[text] for text in texts])
+
+
+@pytest.mark.parametrize("quantization, dtype, atol", [("int8", np.int8, 2e-2), ("fp16", np.float16, 2e-3)])
+def test_quantized_relevances_match_float32(quantization, dtype, atol):
+    """测试低精度相关性计算缓存对应精度的矩阵，分数与float32一致"""
+    pytest.importorskip("simsimd")
+    vectors, query = unit_vectors(20)
+    chunks = [f"chunk-{i}" for i in range(len(vectors))]
+    model = FixedEmbedModel({**dict(zip(chunks, vectors)), "query": query})
+    processor = ContextCompressorProcessor(model, quantization=quantization)
+
+    relevances = processor._calculate_relevances(chunks, "query")
+
+    assert processor._chunk_embedding_cache[1].dtype == dtype
+    np.testing.assert_allclose(relevances, vectors @ query, atol=atol)
+
+
+def test_flat_index_similarity_matches_matmul():
+    """测试FAISS索引得到按文本块原始顺序排列的相似度，与矩阵乘法一致"""
+    pytest.importorskip("faiss")
+    vectors, query = unit_vectors(processors._FAISS_MIN_CHUNKS + 44)
+
+    index = ContextCompressorProcessor._build_flat_index(vectors)
+    similarities = ContextCompressorProcessor._index_similarity(index, query)
+
+    assert index.ntotal == len(vectors)
+    np.testing.assert_allclose(similarities, vectors @ query, atol=1e-5)
+    assert similarities[0] == 0
+
+
+def test_flat_index_only_for_large_chunk_sets():
+    """测试文本块数量不超过阈值时不构建FAISS索引"""
+    vectors, _ = unit_vectors(processors._FAISS_MIN_CHUNKS)
+
+    assert ContextCompressorProcessor._build_flat_index(vectors) is None
+
+
+def test_relevances_through_flat_index_match_float32():
+    """测试文本块较多时通过缓存的FAISS索引计算相关性，分数与矩阵乘法一致"""
+    pytest.importorskip("faiss")
+    vectors, query = unit_vectors(processors._FAISS_MIN_CHUNKS + 44)
+    chunks = [f"chunk-{i}" for i in range(len(vectors))]
+    model = FixedEmbedModel({**dict(zip(chunks, vectors)), "query": query})
+    processor = ContextCompressorProcessor(model)
+
+    relevances = processor._calculate_relevances(chunks, "query")
+
+    assert processor._chunk_embedding_cache[2] is not None
+    np.testing.assert_allclose(relevances, vectors @ query, atol=1e-5)
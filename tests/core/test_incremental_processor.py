@@ -0,0 +1,63 @@
+"""增量处理器测试模块"""
+import pytest
+
+from enterprise_kb.core import incremental_processor
+from enterprise_kb.core.incremental_processor import IncrementalProcessor
+
+
+class FakeVectorStoreManager:
+    """记录写入和删除调用的向量存储管理器"""
+
+    def __init__(self, fail_batches=()):
+        self.fail_batches = set(fail_batches)
+        self.added = []
+        self.deleted = []
+
+    async def add_nodes(self, nodes, datasource_name):
+        batch_index = len(self.added)
+        self.added.append(list(nodes))
+        if batch_index in self.fail_batches:
+            raise ValueError(f"添加节点失败: 批次{batch_index}")
+        return [f"id-{node}" for node in nodes]
+
+    async def delete_node_ids(self, node_ids, datasource_name):
+        self.deleted.extend(node_ids)
+
+
+@pytest.fixture
+def make_processor(monkeypatch):
+    """创建使用假向量存储、每批写入2个节点的增量处理器"""
+    monkeypatch.setattr(incremental_processor.settings, "VECTOR_INSERT_BATCH_SIZE", 2)
+    monkeypatch.setattr(incremental_processor.settings, "VECTOR_INSERT_CONCURRENCY", 1)
+
+    def make(manager):
+        processor = IncrementalProcessor.__new__(IncrementalProcessor)
+        processor.vector_store_manager = manager
+        return processor
+
+    return make
+
+
+@pytest.mark.asyncio
+async def test_batched_add_nodes_keeps_order(make_processor):
+    """测试分批写入返回与节点顺序一致的ID"""
+    manager = FakeVectorStoreManager()
+    processor = make_processor(manager)
+
+    node_ids = await processor._batched_add_nodes(list("abcde"), "primary")
+
+    assert node_ids == [f"id-{node}" for node in "abcde"]
+    assert [len(batch) for batch in manager.added] == [2, 2, 1]
+    assert manager.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_batched_add_nodes_rolls_back_on_failure(make_processor):
+    """测试任一批次失败时删除已写入的节点并重新抛出异常"""
+    manager = FakeVectorStoreManager(fail_batches={1})
+    processor = make_processor(manager)
+
+    with pytest.raises(ValueError, match="批次1"):
+        await processor._batched_add_nodes(list("abcde"), "primary")
+
+    assert sorted(manager.deleted) == ["id-a", "id-b", "id-e"]
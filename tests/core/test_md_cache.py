@@ -0,0 +1,64 @@
+"""MarkItDown转换缓存测试模块"""
+from types import SimpleNamespace
+
+import pytest
+
+from enterprise_kb.core.config.settings import settings
+from enterprise_kb.core.document_pipeline import _md_cache
+
+
+class CountingConverter:
+    """记录转换次数的转换器"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def convert(self, path):
+        self.calls += 1
+        return SimpleNamespace(text_content=f"# {path}")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """使用临时缓存目录并重置缓存状态"""
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(_md_cache, "_entries", None)
+    return tmp_path
+
+
+def test_cache_hit_for_same_content(cache_dir):
+    """测试相同文件第二次转换命中缓存"""
+    source = cache_dir / "a.html"
+    source.write_text("<p>x</p>", encoding="utf-8")
+    converter = CountingConverter()
+
+    first = _md_cache.cached_convert(converter, str(source))
+    second = _md_cache.cached_convert(converter, str(source))
+
+    assert first == second
+    assert converter.calls == 1
+
+
+def test_cache_key_includes_extension(cache_dir):
+    """测试内容相同但扩展名不同的文件不共用缓存"""
+    html_file = cache_dir / "a.html"
+    text_file = cache_dir / "a.txt"
+    html_file.write_text("<p>x</p>", encoding="utf-8")
+    text_file.write_text("<p>x</p>", encoding="utf-8")
+
+    assert _md_cache._cache_key(str(html_file), "") != _md_cache._cache_key(str(text_file), "")
+
+
+def test_legacy_entries_removed(cache_dir):
+    """测试旧版本写在缓存根目录下的条目被清理，其他文件保留"""
+    legacy = cache_dir / f"{'a' * 64}.md"
+    legacy_tmp = cache_dir / f"{'b' * 64}.123.tmp"
+    other = cache_dir / "pipeline_cache.sqlite3"
+    for path in (legacy, legacy_tmp, other):
+        path.write_text("x", encoding="utf-8")
+
+    _md_cache.md_cache_stats()
+
+    assert not legacy.exists()
+    assert not legacy_tmp.exists()
+    assert other.exists()
@@ -0,0 +1,56 @@
+"""元数据写入器测试模块"""
+import pytest
+
+from enterprise_kb.core.metadata_writer import MetadataWriter
+
+
+class FakeRepository:
+    """记录upsert_many调用的文档仓库，前fail_times次调用失败"""
+
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.calls = []
+
+    async def upsert_many(self, documents):
+        self.calls.append([doc["id"] for doc in documents])
+        if len(self.calls) <= self.fail_times:
+            raise RuntimeError("数据库不可用")
+
+
+@pytest.mark.asyncio
+async def test_close_writes_pending_records_in_batches():
+    """测试关闭时写出队列中剩余的记录，并按批合并写入"""
+    repository = FakeRepository()
+    writer = MetadataWriter(repository, batch_size=2, maxsize=10)
+
+    for i in range(5):
+        await writer.put({"id": f"doc-{i}"})
+    await writer.close()
+
+    assert [doc_id for call in repository.calls for doc_id in call] == [f"doc-{i}" for i in range(5)]
+    assert all(len(call) <= 2 for call in repository.calls)
+    assert writer._worker is None
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried():
+    """测试写入失败的批次按次数重试"""
+    repository = FakeRepository(fail_times=2)
+    writer = MetadataWriter(repository, max_retries=2, retry_delay=0)
+
+    await writer.put({"id": "doc-1"})
+    await writer.flush()
+
+    assert repository.calls == [["doc-1"]] * 3
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_is_bounded():
+    """测试写入队列有容量上限"""
+    writer = MetadataWriter(FakeRepository(), maxsize=3)
+
+    await writer.put({"id": "doc-1"})
+
+    assert writer._queue.maxsize == 3
+    await writer.close()
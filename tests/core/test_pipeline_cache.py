@@ -0,0 +1,132 @@
+"""处理管道结果缓存测试模块"""
+import shutil
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from enterprise_kb.core.config.settings import settings
+from enterprise_kb.core.document_pipeline import pipeline_cache, processors
+from enterprise_kb.core.document_pipeline.base import PipelineFactory
+from enterprise_kb.core.document_pipeline.pipeline_cache import PipelineCache
+
+
+@pytest.fixture
+def source_file(tmp_path):
+    """测试用文档"""
+    path = tmp_path / "doc.md"
+    path.write_text("# 标题\n\n正文", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """临时目录下的管道结果缓存"""
+    return PipelineCache(db_path=str(tmp_path / "cache.sqlite3"), max_entries=3)
+
+
+def compute_key(source_file, options=None, processors=("FileValidator", "ChunkingProcessor")):
+    """计算测试文档的缓存键"""
+    return PipelineCache.compute_key(source_file, "md", options or {}, list(processors))
+
+
+def test_key_is_stable(source_file):
+    """测试相同输入得到相同的缓存键"""
+    assert compute_key(source_file) == compute_key(source_file)
+
+
+def test_key_changes_with_inputs(source_file):
+    """测试文件内容、元数据、处理器组成变化时缓存键随之变化"""
+    base = compute_key(source_file, {"metadata": {"doc_id": "a"}})
+
+    assert compute_key(source_file, {"metadata": {"doc_id": "b"}}) != base
+    assert compute_key(source_file, {"metadata": {"doc_id": "a"}}, ("FileValidator",)) != base
+
+    with open(source_file, "a", encoding="utf-8") as f:
+        f.write("\n追加内容")
+    assert compute_key(source_file, {"metadata": {"doc_id": "a"}}) != base
+
+
+def test_key_changes_with_settings(source_file, monkeypatch):
+    """测试影响处理结果的配置变化时缓存键随之变化"""
+    base = compute_key(source_file)
+    monkeypatch.setattr(settings, "NATIVE_TEXT_SPLITTER_ENABLED", not settings.NATIVE_TEXT_SPLITTER_ENABLED)
+
+    assert compute_key(source_file) != base
+
+
+def test_round_trip_preserves_types(cache):
+    """测试缓存结果还原元组、数组和非字符串键"""
+    outputs = {
+        "chunks": ["a", "b"],
+        "document_structure": {"headings": [(1, "标题")]},
+        "embeddings": np.arange(6, dtype=np.float32).reshape(2, 3),
+        "counts": {1: 2},
+    }
+    cache.set("k", outputs)
+    restored = cache.get("k")
+
+    assert restored["chunks"] == ["a", "b"]
+    assert restored["document_structure"]["headings"] == [(1, "标题")]
+    assert restored["counts"] == {1: 2}
+    np.testing.assert_array_equal(restored["embeddings"], outputs["embeddings"])
+    assert restored["embeddings"].dtype == np.float32
+
+
+def test_unserializable_outputs_not_cached(cache):
+    """测试无法序列化的结果不写入缓存"""
+    cache.set("k", {"value": object()})
+
+    assert cache.get("k") is None
+
+
+def test_evicts_oldest_entries(cache):
+    """测试超出条目上限时淘汰最早的条目"""
+    for i in range(5):
+        cache.set(f"k{i}", {"i": i})
+
+    assert cache.get("k0") is None
+    assert cache.get("k1") is None
+    assert cache.get("k4") == {"i": 4}
+
+
+def test_expired_entries_ignored(tmp_path):
+    """测试过期条目不再命中"""
+    cache = PipelineCache(db_path=str(tmp_path / "cache.sqlite3"), max_age_seconds=-1)
+    cache.set("k", {"i": 1})
+
+    assert cache.get("k") is None
+
+
+def run_cached_pipeline(file_path):
+    """使用启用结果缓存的管道处理文档"""
+    pipeline = PipelineFactory.create_pipeline("md", use_markitdown=False, use_cache=True)
+    return pipeline.process({
+        "file_path": file_path,
+        "file_type": "md",
+        "metadata": {"doc_id": "doc-1"},
+        "convert_to_markdown": False,
+    })
+
+
+def test_pipeline_hits_cache_for_copied_file(tmp_path, monkeypatch):
+    """测试内容相同的文件副本（inode、访问时间不同）命中管道结果缓存"""
+    test_settings = SimpleNamespace(**{
+        **settings.model_dump(),
+        "CACHE_DIR": str(tmp_path / "cache"),
+        "MAX_FILE_SIZE_BYTES": 10 * 1024 * 1024,
+        "MAX_CHUNK_SIZE": 1000,
+    })
+    monkeypatch.setattr(processors, "settings", test_settings)
+    monkeypatch.setattr(pipeline_cache, "settings", test_settings)
+    first_path = tmp_path / "first.md"
+    first_path.write_text("# 标题\n\n正文内容", encoding="utf-8")
+    copy_path = tmp_path / "copy.md"
+    shutil.copyfile(first_path, copy_path)
+
+    first = run_cached_pipeline(str(first_path))
+    second = run_cached_pipeline(str(copy_path))
+
+    assert not first.get("pipeline_cache_hit")
+    assert second.get("pipeline_cache_hit") is True
+    assert second["chunks"] == first["chunks"]
@@ -0,0 +1,82 @@
+"""文档仓库测试模块"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import mysql
+
+from enterprise_kb.db.repositories.document_repository import DocumentRepository
+
+
+class FakeSession:
+    """记录执行语句的异步会话"""
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+    async def commit(self):
+        pass
+
+
+def make_document(doc_id):
+    """构造一条文档元数据记录"""
+    now = datetime(2024, 1, 1)
+    return {
+        "id": doc_id,
+        "file_name": f"{doc_id}.pdf",
+        "file_path": f"/data/{doc_id}.pdf",
+        "file_type": "pdf",
+        "title": doc_id,
+        "description": None,
+        "status": "completed",
+        "size_bytes": 100,
+        "node_count": 3,
+        "metadata": {"source": "test"},
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+@pytest.fixture
+def repository():
+    """使用记录语句的会话工厂的文档仓库"""
+    statements = []
+    repo = DocumentRepository(session_factory=lambda: FakeSession(statements))
+    repo.statements = statements
+    return repo
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_single_statement(repository):
+    """测试多条记录通过一条INSERT ... ON DUPLICATE KEY UPDATE写入"""
+    await repository.upsert_many([make_document("doc-1"), make_document("doc-2")])
+
+    assert len(repository.statements) == 1
+    compiled = repository.statements[0].compile(dialect=mysql.dialect())
+    sql = str(compiled)
+    insert_part, update_part = sql.split("ON DUPLICATE KEY UPDATE")
+
+    # 两行数据，元数据写入doc_metadata列
+    assert insert_part.count("(%s,") == 2
+    assert "doc_metadata" in insert_part
+    # 已存在的文档保留ID和创建时间，其余字段更新
+    assert "created_at" not in update_part
+    assert "id = " not in update_part
+    for column in ("file_name", "status", "node_count", "doc_metadata", "updated_at"):
+        assert f"{column} = VALUES({column})" in update_part
+
+
+@pytest.mark.asyncio
+async def test_upsert_many_empty_is_noop(repository):
+    """测试空列表不执行任何语句"""
+    await repository.upsert_many([])
+
+    assert repository.statements == []
@@ -0,0 +1,60 @@
+"""文件类型识别测试模块"""
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+from enterprise_kb.utils import file_type
+from enterprise_kb.utils.file_type import detect_file_type
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-'
+    'officedocument.wordprocessingml.document.main+xml"/></Types>'
+)
+
+
+@pytest.fixture
+def zip_magic(monkeypatch):
+    """只读取头部时将zip文件识别为application/zip的libmagic"""
+    monkeypatch.setattr(
+        file_type, "_magic",
+        SimpleNamespace(from_buffer=lambda head, mime: "application/zip" if head[:2] == b"PK" else "text/plain")
+    )
+    file_type._sniff_type.cache_clear()
+    yield
+    file_type._sniff_type.cache_clear()
+
+
+def write_zip(path, members):
+    """写入包含给定成员的zip文件"""
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def test_detect_docx_from_content_types(zip_magic, tmp_path):
+    """测试扩展名错误的docx按[Content_Types].xml识别"""
+    path = write_zip(tmp_path / "report.pptx", {"[Content_Types].xml": DOCX_CONTENT_TYPES})
+
+    assert detect_file_type(path) == "docx"
+
+
+def test_detect_plain_zip_keeps_extension(zip_magic, tmp_path):
+    """测试普通zip包和无法识别的内容按扩展名处理"""
+    zip_path = write_zip(tmp_path / "report.docx", {"readme.txt": "hello"})
+    text_path = tmp_path / "notes.md"
+    text_path.write_text("# 标题", encoding="utf-8")
+
+    assert detect_file_type(zip_path) == "docx"
+    assert detect_file_type(str(text_path)) == "md"
+
+
+def test_detect_without_magic_uses_extension(monkeypatch, tmp_path):
+    """测试未安装python-magic时按扩展名识别"""
+    monkeypatch.setattr(file_type, "_magic", None)
+    path = write_zip(tmp_path / "Report.DOCX", {"[Content_Types].xml": DOCX_CONTENT_TYPES})
+
+    assert detect_file_type(path) == "docx"